@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Headless batch evaluation of recorded videos
+
+Runs the same detection, comparison and section counting logic as the GUI
+session (SessionOperator) over every video in a directory, spreading the
+videos across a process pool. For each video a JSON summary with the same
+fields as Logger.session_stats is written to the output directory, plus a
+combined summary.json.
+
+Example:
+    python batch_evaluator.py /data/recordings --model ../resources/models/right_part_medium.pt --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+MAIN_PATH = Path(__file__).resolve()
+resources_path = MAIN_PATH.resolve().parent.parent / "resources"
+
+right_base_image_path = str(resources_path / "base_images/right_base_image.png")
+left_base_image_path = str(resources_path / "base_images/left_base_image.png")
+
+VIDEO_EXTENSIONS = {".webm", ".mp4", ".avi", ".mkv", ".mov"}
+
+
+def _init_worker(threads_per_worker):
+    """Limit per-process thread pools so workers do not oversubscribe the cores"""
+    # Read by comparer_module when evaluate_video first imports it in this process
+    os.environ['MATCH_WORKERS'] = str(threads_per_worker)
+    import cv2
+    import torch
+    cv2.setNumThreads(threads_per_worker)
+    torch.set_num_threads(threads_per_worker)
+
+
+def output_name(video_path, input_dir):
+    """JSON file name unique per video: its path below input_dir with separators replaced"""
+    relative = Path(video_path).relative_to(input_dir).with_suffix("")
+    return "__".join(relative.parts) + ".json"
+
+
+def evaluate_video(video_path, model_path, output_dir, input_dir):
+    """
+    Process one recording headlessly and write its session statistics
+
+    Returns:
+        dict: summary with the video path, frame count, wall time and session_stats
+    """
+    # Imported here so only worker processes load the models
+    from frame_source_module import VideoFileSource
+    from session_operator import SessionOperator
+
+    start_time = time.time()
+    source = VideoFileSource(video_path, realtime=False)
+    operator = None
+    try:
+        operator = SessionOperator(
+            tkinter_frame=None,
+            end_session_callback=None,
+            model_path=model_path,
+            right_base_image_path=right_base_image_path,
+            left_base_image_path=left_base_image_path,
+            use_pipeline=False,
+            frame_source=source
+        )
+
+        # Comparer already consumed the first frame while opening the source
+        frame = operator.comparer.frame
+        frames_processed = 0
+        while frame is not None:
+            media_time = frames_processed / source.get_fps()
+            packet = operator.process_frame(frame, media_time=media_time, render=False)
+            operator.comparer.logger.add_processing_time(packet['processing_time'])
+            frames_processed += 1
+            ret, frame = source.read()
+            if not ret:
+                frame = None
+    finally:
+        source.release()
+        if operator is not None:
+            # Worker processes evaluate many videos; free the match threads and model hooks of each
+            operator.comparer.close()
+
+    logger = operator.comparer.logger
+    session_stats = dict(logger.session_stats)
+    if session_stats.get("session_start_time") is not None:
+        session_stats["session_start_time"] = session_stats["session_start_time"].isoformat()
+
+    output_path = Path(output_dir) / output_name(video_path, input_dir)
+    with open(output_path, "w") as f:
+        json.dump(session_stats, f, indent=2)
+
+    return {
+        "video": str(video_path),
+        "frames_processed": frames_processed,
+        "wall_time": time.time() - start_time,
+        "session_stats": session_stats
+    }
+
+
+def find_videos(input_dir):
+    """Return all video files below input_dir in sorted order"""
+    return sorted(p for p in Path(input_dir).rglob("*") if p.suffix.lower() in VIDEO_EXTENSIONS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a model on a directory of recorded videos without the GUI")
+    parser.add_argument("input_dir", help="Directory containing recorded videos")
+    parser.add_argument("--model", required=True, help="Path to the part detection model (.pt)")
+    parser.add_argument("--output", default="batch_results", help="Directory for per-video JSON summaries")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Torch/OpenCV threads per worker (default: cores divided by workers)")
+    args = parser.parse_args()
+
+    videos = find_videos(args.input_dir)
+    if not videos:
+        print(f"No videos found in {args.input_dir}")
+        return
+
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(args.workers, len(videos)))
+    threads_per_worker = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    print(f"Evaluating {len(videos)} videos with {workers} workers ({threads_per_worker} threads each)")
+
+    summaries = []
+    start_time = time.time()
+    # Spawn keeps CUDA and torch thread pools out of forked children
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as executor:
+        futures = {
+            executor.submit(evaluate_video, str(video), str(args.model), args.output, args.input_dir): video
+            for video in videos
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                print(f"Failed to evaluate {video}: {e}")
+                summaries.append({"video": str(video), "error": str(e)})
+                continue
+            stats = summary["session_stats"]
+            fps = summary["frames_processed"] / summary["wall_time"] if summary["wall_time"] > 0 else 0.0
+            print(f"{video.name}: {summary['frames_processed']} frames at {fps:.1f} FPS, "
+                  f"{stats['total_objects_detected']} objects, {stats['failed_detections']} failed, "
+                  f"{stats['changed_side_detections']} changed side, "
+                  f"{stats['left_sticker_errors'] + stats['right_sticker_errors']} sticker errors")
+            summaries.append(summary)
+
+    with open(Path(args.output) / "summary.json", "w") as f:
+        json.dump(sorted(summaries, key=lambda s: s["video"]), f, indent=2)
+    print(f"Finished in {time.time() - start_time:.1f}s, results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tracking overhead and ID switches of the built-in IoU tracker against model.track
+
+Runs the part model over a recording twice: once with model.track (the
+ultralytics tracker, used as the reference) and once with model.predict.
+The per-frame tracking overhead of ultralytics is the difference of the
+two. The IoU tracker is then fed the predict output at every detection
+interval in --intervals and extrapolates in between. For each interval it
+reports tracker time per frame, the estimated cost per frame including
+detection, ID switches and coverage against the reference tracks, and
+the mean IoU with the reference boxes.
+
+Example:
+    python benchmark_part_tracker.py --model ../resources/models/parts.pt --intervals 1 2 3 5
+"""
+
+import argparse
+import time
+import cv2
+import numpy as np
+from comparer_module import test_video_path
+from model_registry import load_yolo_model
+from spatial_module import iou_matrix
+from tracker_module import IoUTracker
+
+
+def load_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run_model(model, frames, method):
+    """boxes.data of every frame and mean seconds per frame for model.track or model.predict"""
+    outputs = []
+    start_time = time.perf_counter()
+    for frame in frames:
+        if method == 'track':
+            results = model.track(frame, verbose=False, persist=True)
+        else:
+            results = model.predict(frame, verbose=False)
+        outputs.append(results[0].boxes.data.cpu().numpy())
+    return outputs, (time.perf_counter() - start_time) / max(len(frames), 1)
+
+
+def run_tracker(detections, interval):
+    """IoU tracker output of every frame and mean seconds per frame, detecting every interval-th frame"""
+    tracker = IoUTracker()
+    outputs = []
+    elapsed = 0.0
+    for index, data in enumerate(detections):
+        start_time = time.perf_counter()
+        outputs.append(tracker.update(data) if index % interval == 0 else tracker.predict())
+        elapsed += time.perf_counter() - start_time
+    return outputs, elapsed / max(len(detections), 1)
+
+
+def compare_tracks(reference, outputs, min_conf=0.5, min_iou=0.5):
+    """
+    ID switches, coverage and mean IoU of tracked outputs against reference tracks
+
+    Every confident reference box is matched to an output box (one-to-one,
+    highest IoU first). A switch is counted whenever a reference track is
+    matched to a different output id than the last time it was matched.
+    """
+    assigned = {}
+    switches = 0
+    matched = 0
+    total = 0
+    ious = []
+    for ref, out in zip(reference, outputs):
+        if ref.shape[1] != 7:
+            continue  # Nothing tracked in this frame
+        ref = ref[ref[:, 5] >= min_conf]
+        total += len(ref)
+        if len(ref) == 0 or len(out) == 0:
+            continue
+        overlaps = iou_matrix(ref, out)
+        rows, cols = np.nonzero(overlaps > min_iou)
+        order = np.argsort(-overlaps[rows, cols], kind='stable')
+        used_rows, used_cols = set(), set()
+        for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+            if i in used_rows or j in used_cols:
+                continue
+            used_rows.add(i)
+            used_cols.add(j)
+            ref_id, out_id = int(ref[i, 4]), int(out[j, 4])
+            if ref_id in assigned and assigned[ref_id] != out_id:
+                switches += 1
+            assigned[ref_id] = out_id
+            matched += 1
+            ious.append(overlaps[i, j])
+    return switches, matched / max(total, 1), float(np.mean(ious)) if ious else float('nan')
+
+
+def unique_ids(outputs):
+    ids = set()
+    for out in outputs:
+        if len(out) and out.shape[1] == 7:
+            ids.update(out[:, 4].astype(int).tolist())
+    return len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the built-in IoU tracker against model.track")
+    parser.add_argument("--model", required=True, help="Path to the part detection model (.pt)")
+    parser.add_argument("--video", default=test_video_path, help="Recording to track parts in")
+    parser.add_argument("--max-frames", type=int, default=600, help="Maximum number of frames to use")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 2, 3, 5],
+                        help="Detection intervals (frames) for the IoU tracker")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.max_frames)
+    model = load_yolo_model(args.model)
+    model.predict(frames[0], verbose=False)  # Warm up before timing
+    detections, predict_seconds = run_model(model, frames, 'predict')
+    reference, track_seconds = run_model(model, frames, 'track')
+    print(f"{len(frames)} frames from {args.video}")
+    print(f"model.predict {predict_seconds * 1000:.2f} ms/frame, model.track {track_seconds * 1000:.2f} ms/frame, "
+          f"ultralytics tracking overhead {(track_seconds - predict_seconds) * 1000:.2f} ms/frame, "
+          f"{unique_ids(reference)} track ids")
+
+    print(f"{'tracker':>12} {'interval':>8} {'track ms':>9} {'est. ms/frame':>14} {'id switches':>12} "
+          f"{'coverage':>9} {'mean IoU':>9} {'ids':>5}")
+    for interval in args.intervals:
+        outputs, tracker_seconds = run_tracker(detections, interval)
+        switches, coverage, mean_iou = compare_tracks(reference, outputs)
+        per_frame = predict_seconds / interval + tracker_seconds
+        print(f"{'iou':>12} {interval:>8} {tracker_seconds * 1000:>9.3f} {per_frame * 1000:>14.2f} {switches:>12} "
+              f"{coverage:>8.1%} {mean_iou:>9.3f} {unique_ids(outputs):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of left/right sticker conflict resolution
+
+Compares the previous pair-by-pair Python implementation with the
+IoU-matrix version in sticker_module on synthetic frames with 2 to 200
+stickers, half of which overlap a sticker of the other side.
+
+Example:
+    python benchmark_sticker_conflicts.py --sizes 2 10 50 200 --repeats 200
+"""
+
+import argparse
+import time
+import numpy as np
+from spatial_module import iou, resolve_sticker_conflicts
+
+
+def resolve_pairwise(left_stickers, right_stickers, iou_threshold=0.5):
+    """Previous implementation: IoU pair by pair with a greedy scan per left sticker"""
+    resolved_left = []
+    resolved_right = []
+    used_right = set()
+
+    for lbox in left_stickers:
+        best_j = -1
+        best_overlap = 0
+        for j, rbox in enumerate(right_stickers):
+            if j in used_right:
+                continue
+            score = iou(lbox[:4], rbox[:4])
+            if score > best_overlap:
+                best_overlap = score
+                best_j = j
+
+        if best_overlap > iou_threshold:
+            if lbox[4] > right_stickers[best_j][4]:
+                resolved_left.append(lbox)
+            else:
+                resolved_right.append(right_stickers[best_j])
+            used_right.add(best_j)
+        else:
+            resolved_left.append(lbox)
+
+    for j, rbox in enumerate(right_stickers):
+        if j not in used_right:
+            resolved_right.append(rbox)
+
+    return (np.array(resolved_left, dtype=np.float32).reshape(-1, 5),
+            np.array(resolved_right, dtype=np.float32).reshape(-1, 5))
+
+
+def make_stickers(count, rng, frame_size=(640, 480), size=40):
+    """Random left and right stickers (count in total); every other right sticker overlaps a left one"""
+    n_left = count // 2
+    n_right = count - n_left
+    width, height = frame_size
+    corners = rng.uniform((0, 0), (width - size, height - size), size=(n_left, 2))
+    left = np.hstack([corners, corners + size, rng.uniform(0.7, 1.0, (n_left, 1))]).astype(np.float32)
+
+    corners = rng.uniform((0, 0), (width - size, height - size), size=(n_right, 2))
+    overlapping = np.arange(n_right) % 2 == 0
+    shared = min(int(overlapping.sum()), n_left)
+    corners[np.flatnonzero(overlapping)[:shared]] = left[:shared, :2] + rng.uniform(-4, 4, (shared, 2))
+    right = np.hstack([corners, corners + size, rng.uniform(0.7, 1.0, (n_right, 1))]).astype(np.float32)
+    return left, right
+
+
+def time_call(func, left, right, repeats):
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        func(left, right)
+    return (time.perf_counter() - start_time) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sticker conflict resolution")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20, 50, 100, 200],
+                        help="Total number of stickers per frame")
+    parser.add_argument("--repeats", type=int, default=100, help="Calls timed per size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'stickers':>8} {'pairwise ms':>12} {'matrix ms':>10} {'speedup':>8} {'kept (pairwise/matrix)':>24}")
+    for count in args.sizes:
+        left, right = make_stickers(count, rng)
+        pairwise = time_call(resolve_pairwise, left, right, args.repeats)
+        matrix = time_call(resolve_sticker_conflicts, left, right, args.repeats)
+        kept_pairwise = sum(len(a) for a in resolve_pairwise(left, right))
+        kept_matrix = sum(len(a) for a in resolve_sticker_conflicts(left, right))
+        print(f"{count:>8} {pairwise * 1000:>12.3f} {matrix * 1000:>10.3f} {pairwise / matrix:>7.1f}x "
+              f"{f'{kept_pairwise}/{kept_matrix}':>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy comparison of the template matching engines
+
+Crops the right and left test boxes from frames of a recording, scores
+them against the base images with every engine in template_module.MATCHERS
+(or those given with --engines), and reports time per test, correlation
+passes, score deviation from the exhaustive engine and how often the
+engine reaches the same left/right decision, overall and on decisive tests
+(exhaustive score above the warning threshold).
+
+Example:
+    python benchmark_template_engines.py --video ../resources/test_video/test_video.webm --stride 10
+"""
+
+import argparse
+import time
+import cv2
+import numpy as np
+from comparer_module import TEST_BOXES, left_base_image_path, right_base_image_path, test_video_path
+from template_module import MATCHERS, TemplateBank, create_matcher, to_gray
+
+
+def load_crops(video_path, stride, max_frames):
+    """(box_idx, grayscale crop) pairs for both test boxes of every stride-th frame"""
+    cap = cv2.VideoCapture(video_path)
+    crops = []
+    frame_index = 0
+    while len(crops) < 2 * max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_index % stride == 0:
+            for box_idx, ((x1, y1), (x2, y2)) in enumerate(TEST_BOXES):
+                crops.append((box_idx, to_gray(frame[y1:y2, x1:x2])))
+        frame_index += 1
+    cap.release()
+    return crops
+
+
+def run_engine(matcher, bank, crops):
+    """Score every crop; returns (right, left) score arrays and seconds per test"""
+    scores = []
+    start_time = time.perf_counter()
+    for box_idx, crop in crops:
+        right_name, left_name = bank.references_for_box(box_idx)
+        right_score, left_score = matcher.score(crop, right_name), matcher.score(crop, left_name)
+        if hasattr(matcher, 'normalize'):
+            right_score, left_score = matcher.normalize(right_score, left_score)
+        scores.append((right_score, left_score))
+    elapsed = time.perf_counter() - start_time
+    return np.array(scores, dtype=np.float64), elapsed / max(len(crops), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare template matching engines on recorded frames")
+    parser.add_argument("--video", default=test_video_path, help="Recording to take box crops from")
+    parser.add_argument("--stride", type=int, default=25, help="Use every n-th frame")
+    parser.add_argument("--max-frames", type=int, default=100, help="Maximum number of frames to use")
+    # Engines that read the part model's features need live inference and are not benchmarked here
+    pixel_engines = [name for name, matcher in MATCHERS.items() if not getattr(matcher, 'needs_model', False)]
+    parser.add_argument("--engines", nargs="+", default=pixel_engines, help="Engines to compare")
+    parser.add_argument("--warning-threshold", type=float, default=0.8,
+                        help="Comparer.warning_threshold, used to pick out decisive tests")
+    parser.add_argument("--angle-step", type=int, default=15,
+                        help="Rotation step of the template bank in degrees (smaller = more rotations)")
+    args = parser.parse_args()
+
+    right_base = cv2.imread(right_base_image_path)
+    left_base = cv2.imread(left_base_image_path)
+    bank = TemplateBank(right_base, left_base, angle_step=args.angle_step)
+    crops = load_crops(args.video, args.stride, args.max_frames)
+    print(f"{len(crops)} box crops from {args.video}, {len(bank.angles)} rotations per base image")
+
+    reference, _ = run_engine(create_matcher('exhaustive', bank, right_base, left_base), bank, crops)
+    reference_decision = reference[:, 1] > reference[:, 0]
+    # Tests whose exhaustive score clears the warning threshold are the ones that can raise a warning
+    decisive = reference.max(axis=1) > args.warning_threshold
+
+    print(f"{'engine':>12} {'ms/test':>8} {'passes/test':>12} {'mean |dev|':>11} {'max |dev|':>10} "
+          f"{'agreement':>10} {f'decisive ({decisive.sum()})':>15}")
+    for engine in args.engines:
+        matcher = create_matcher(engine, bank, right_base, left_base)
+        scores, seconds = run_engine(matcher, bank, crops)
+        agrees = (scores[:, 1] > scores[:, 0]) == reference_decision
+        agreement = agrees.mean()
+        decisive_agreement = agrees[decisive].mean() if decisive.any() else float('nan')
+        passes = getattr(matcher, 'passes', 0) / max(len(crops), 1)
+        if hasattr(matcher, 'normalize'):
+            # Normalized scores are not on the correlation scale; only the decision is comparable
+            mean_deviation = max_deviation = "-"
+        else:
+            deviation = np.abs(scores - reference)
+            mean_deviation, max_deviation = f"{deviation.mean():.4f}", f"{deviation.max():.4f}"
+        print(f"{engine:>12} {seconds * 1000:>8.2f} {passes:>12.1f} {mean_deviation:>11} "
+              f"{max_deviation:>10} {agreement:>9.1%} {decisive_agreement:>14.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import threading
+import time
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of preallocated frame slots stamped with capture time"""
+
+    def __init__(self, frame_shape, capacity=4, dtype=np.uint8):
+        if capacity < 2:
+            raise ValueError("Ring buffer needs at least 2 slots")
+        self.capacity = capacity
+        self.frame_shape = tuple(frame_shape)
+        self.frames = np.empty((capacity,) + self.frame_shape, dtype=dtype)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.write_seq = 0  # Sequence number of the next frame to be written
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+
+    def write_slot(self):
+        """Slot the writer may fill next; never the newest committed slot"""
+        return self.frames[self.write_seq % self.capacity]
+
+    def commit(self, timestamp):
+        """Publish the slot returned by write_slot() as the newest frame"""
+        with self.lock:
+            self.timestamps[self.write_seq % self.capacity] = timestamp
+            self.write_seq += 1
+            self.new_frame.notify_all()
+
+    def newest(self, after_seq=-1, timeout=None):
+        """
+        Copy out the newest frame if it is newer than after_seq
+
+        Returns:
+            tuple: (frame, timestamp, seq) or None if no newer frame arrived
+        """
+        with self.lock:
+            if self.write_seq - 1 <= after_seq and timeout:
+                self.new_frame.wait(timeout)
+            seq = self.write_seq - 1
+            if seq <= after_seq:
+                return None
+            idx = seq % self.capacity
+            # Copy while holding the lock so the writer cannot wrap onto this slot
+            return self.frames[idx].copy(), float(self.timestamps[idx]), seq
+
+
+class CameraCapture:
+    """Reads frames from a cv2.VideoCapture-like source on a dedicated thread"""
+
+    def __init__(self, cap, buffer_size=4, max_read_failures=30, retry_delay=0.01):
+        self.cap = cap
+        self.buffer_size = buffer_size
+        self.max_read_failures = max_read_failures  # Consecutive failed reads before giving up
+        self.retry_delay = retry_delay
+        self.ring = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._last_seq = -1
+
+        # Statistics
+        self.captured_frames = 0
+        self.delivered_frames = 0
+        self.dropped_frames = 0
+        self.read_failures = 0
+
+    def start(self, first_frame=None):
+        """Start the capture thread, optionally sizing the ring from a known frame"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if first_frame is None:
+            ret, first_frame = self.cap.read()
+            if not ret:
+                raise RuntimeError("Failed to grab a frame to start capture.")
+        self.ring = FrameRingBuffer(first_frame.shape, capacity=self.buffer_size, dtype=first_frame.dtype)
+        np.copyto(self.ring.write_slot(), first_frame)
+        self.ring.commit(time.time())
+        self.captured_frames += 1
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraCapture", daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        consecutive_failures = 0
+        while not self._stop_event.is_set():
+            slot = self.ring.write_slot()
+            ret, frame = self.cap.read(slot)
+            timestamp = time.time()
+            if not ret or frame is None:
+                consecutive_failures += 1
+                self.read_failures += 1
+                if consecutive_failures >= self.max_read_failures:
+                    print(f"Capture stopped after {consecutive_failures} consecutive failed reads")
+                    break
+                time.sleep(self.retry_delay)
+                continue
+            consecutive_failures = 0
+
+            if frame is not slot:
+                if frame.shape != self.ring.frame_shape:
+                    # Resolution changed; reallocate the ring for the new frame size
+                    print(f"Capture resolution changed to {frame.shape[1]}x{frame.shape[0]}")
+                    with self.ring.lock:
+                        self.ring = FrameRingBuffer(frame.shape, capacity=self.buffer_size, dtype=frame.dtype)
+                        self._last_seq = -1
+                    slot = self.ring.write_slot()
+                np.copyto(slot, frame)
+
+            self.ring.commit(timestamp)
+            self.captured_frames += 1
+
+        # Wake up any reader blocked in read()
+        with self.ring.lock:
+            self.ring.new_frame.notify_all()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self, timeout=None):
+        """
+        Hand out the newest captured frame, skipping any stale ones
+
+        Args:
+            timeout: seconds to wait for a new frame, None returns immediately
+
+        Returns:
+            tuple: (frame, capture_timestamp) or None if no new frame is available
+        """
+        if self.ring is None:
+            return None
+        packet = self.ring.newest(after_seq=self._last_seq, timeout=timeout)
+        if packet is None:
+            return None
+        frame, timestamp, seq = packet
+        if self._last_seq >= 0:
+            self.dropped_frames += max(0, seq - self._last_seq - 1)
+        self._last_seq = seq
+        self.delivered_frames += 1
+        return frame, timestamp
+
+    def read(self, timeout=1.0):
+        """cv2.VideoCapture-style read of the newest frame"""
+        while True:
+            packet = self.latest(timeout=timeout)
+            if packet is not None:
+                return True, packet[0]
+            if not self.is_alive():
+                return False, None
+
+    def stats(self):
+        """Return capture counters"""
+        return {
+            'captured_frames': self.captured_frames,
+            'delivered_frames': self.delivered_frames,
+            'dropped_frames': self.dropped_frames,
+            'read_failures': self.read_failures
+        }
+
+    def stop(self):
+        """Stop the capture thread; the caller still owns and releases the source"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        print(f"Capture stopped: {self.stats()}")
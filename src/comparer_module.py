@@ -1,10 +1,15 @@
+import os
 import cv2
-import numpy as np
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import time
-from ultralytics import YOLO
 from pathlib import Path
 from logger_module import Logger
+from frame_source_module import CameraSource
+from model_registry import get_model, reset_tracker
+from track_state_module import TrackStateStore
+from template_module import MATCH_ENGINES, ExhaustiveMatcher, TemplateBank, create_matcher, to_gray
+from zone_module import ZoneLayout, load_zone_config, polygon_bounds
 
 # TODO According to how model name is stored, change the model name for that session
 
@@ -18,8 +23,20 @@ left_base_image_path = str(resources_path / "base_images/left_base_image.png")
 # For testing purposes
 test_video_path = str(resources_path / "test_video/test_video.webm")
 
+# Right and left test zones (polygons) and the vertical section layout, see zone_module.ZONE_LAYOUT
+TEST_ZONES, SECTIONS = load_zone_config()
+# Bounding boxes of the test zones; crops for the placement test are taken from these
+TEST_BOXES = [polygon_bounds(zone) for zone in TEST_ZONES]
+
+# Template matching engine used by test_frame: "exhaustive", "pyramid", "fft", "orb" or "embedding"
+MATCH_ENGINE = os.getenv('MATCH_ENGINE', 'exhaustive')
+if MATCH_ENGINE not in MATCH_ENGINES:
+    raise ValueError(f"Unknown MATCH_ENGINE '{MATCH_ENGINE}', expected one of {', '.join(MATCH_ENGINES)}")
+# Threads scoring (box, base image, angle) jobs; 1 scores inline
+MATCH_WORKERS = int(os.getenv('MATCH_WORKERS', str(os.cpu_count() or 1)))
+
 class Comparer:
-    def __init__(self, camera_id=2, model_path=None, user_info=None):
+    def __init__(self, camera_id=2, model_path=None, user_info=None, frame_source=None, load_model=True):
         
         model_name = Path(model_path).stem
         print(f"Model name: {model_name}")
@@ -33,50 +50,32 @@ class Comparer:
         self.logger.init(model_name=model_name, user_id=user_id)
         self.logger.start_session()  # Start timing the session
         
-        #self.cap = cv2.VideoCapture(test_video_path)
-        
-        # Try camera index 3 first, then fallback to 0
-        self.cap = cv2.VideoCapture(0)
+        # Live camera by default; pass a video file, image directory or raw dump source to replay
+        self.cap = frame_source if frame_source is not None else CameraSource()
         if not self.cap.isOpened():
-            print("Camera index 3 not available, trying camera index 0...")
-            self.cap = cv2.VideoCapture(0)
-        
-        if not self.cap.isOpened():
-            print("Failed to open any camera.")
-            exit()
+            raise RuntimeError("Failed to open frame source.")
 
         ret, self.frame = self.cap.read()
         if not ret:
-            print("Failed to grab a frame from camera.")
-            # Try alternative camera indices
-            for cam_idx in [0, 1, 2, 4]:
-                print(f"Trying camera index {cam_idx}...")
-                self.cap.release()
-                self.cap = cv2.VideoCapture(cam_idx)
-                if self.cap.isOpened():
-                    ret, self.frame = self.cap.read()
-                    if ret:
-                        print(f"Successfully connected to camera index {cam_idx}")
-                        break
-            
-            if not ret:
-                print("Failed to grab a frame from any camera.")
-                exit()
+            raise RuntimeError("Failed to grab a frame from frame source.")
 
         # Get the height and width of the frame
         self.height, self.width, _ = self.frame.shape
 
-        self.boxes = [
-            [(35, 120), (165, 250)],  # Right box
-            [(450, 120), (580, 250)]   # Left box
-        ]
+        self.boxes = [list(box) for box in TEST_BOXES]
+        # Zone-id lookup mask of the test zones, built once for the frame size
+        self.test_zones = ZoneLayout(TEST_ZONES, self.width, self.height)
 
-        self.index_side_info = [0] * 1000
-        self.index_warning_info = [0] * 1000
+        # Placement verdict and side warning per track id, shared with SessionOperator
+        self.tracks = TrackStateStore()
 
-        # Initialize YOLO model
-        self.model = YOLO(model_path)
-        print(f"Model loaded from {model_path}")
+        # Reuse a warm YOLO model from the shared registry; start with fresh track ids.
+        # Skipped when an out-of-process inference server owns the model.
+        self.model = None
+        if load_model:
+            self.model = get_model(model_path)
+            reset_tracker(self.model)
+            print(f"Model loaded from {model_path}")
         # Add these parameters
         self.BBOX_HISTORY_SIZE = 5  # Number of previous bounding boxes to store
         self.MOVEMENT_THRESHOLD = 5  # Maximum allowed movement in pixels
@@ -107,6 +106,13 @@ class Comparer:
         self.base_images_loaded = False
         self.right_base = None
         self.left_base = None
+        self.template_bank = None
+        self.match_engine = MATCH_ENGINE
+        self.matcher = None
+        self.frame_features = None  # Part model features of self.frame, for the embedding engine
+        # cv2.matchTemplate releases the GIL, so scoring jobs run in parallel on threads
+        self.match_executor = ThreadPoolExecutor(max_workers=MATCH_WORKERS, thread_name_prefix="TemplateMatch") \
+            if MATCH_WORKERS > 1 else None
         self.yolo_detections = None
         self.sticker_warning_timestamp = 0  # For 1-second left-sticker-on-right-part alert
 
@@ -115,70 +121,111 @@ class Comparer:
         try:
             self.right_base = cv2.imread(right_base_image_path)
             self.left_base = cv2.imread(left_base_image_path)
+            # Grayscale, mirrored and rotated templates are prepared once, not on every test
+            start_time = time.time()
+            self.template_bank = TemplateBank(self.right_base, self.left_base)
+            source = "loaded from cache" if self.template_bank.loaded_from_cache else "built"
+            self.matcher = self._create_matcher()
+            print(f"Template bank {source} and {self.match_engine} matcher ready in {time.time() - start_time:.3f}s")
             self.base_images_loaded = True
             print("Base images loaded successfully")
         except Exception as e:
             print(f"Error loading base images: {e}")
             self.base_images_loaded = False
 
-    def rotate_image(self, image, angle):
-        """Rotate image by given angle"""
-        h, w = image.shape[:2]
-        center = (w // 2, h // 2)
-        rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated_image = cv2.warpAffine(image, rotation_matrix, (w, h))
-        return rotated_image
-
-    def get_best_template_match(self, image, template):
-        """Calculate best template matching score across all rotations"""
-        best_score = -1
-        angles = range(0, 360, 15)
-        
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        if len(template.shape) == 3:
-            template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-
-        for angle in angles:
-            rotated_template = self.rotate_image(template, angle)
-            result = cv2.matchTemplate(image, rotated_template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, _ = cv2.minMaxLoc(result)
-            best_score = max(best_score, max_val)
-        
-        return best_score
+    def _create_matcher(self):
+        """Matcher for match_engine; exhaustive matching if it cannot be built, so placement tests never stop"""
+        try:
+            return create_matcher(self.match_engine, self.template_bank, self.right_base, self.left_base,
+                                  model=self.model)
+        except Exception as e:
+            print(f"WARNING: {self.match_engine} match engine unavailable ({e}), using exhaustive matching")
+            self.match_engine = 'exhaustive'
+            return ExhaustiveMatcher(self.template_bank)
+
+    def close(self):
+        """Stop the match threads and unhook the matcher from the shared part model"""
+        if self.match_executor is not None:
+            self.match_executor.shutdown(wait=False)
+            self.match_executor = None
+        if hasattr(self.matcher, 'close'):
+            self.matcher.close()
 
     def test_frame(self, frame, box_idx):
         """Test current frame and return results"""
-        #print("box_idx: ", box_idx)
         if not self.base_images_loaded:
             return None
-        results = []
-        box = self.boxes[box_idx]
-        x1, y1 = box[0]
-        x2, y2 = box[1]
-        x1, x2 = min(x1, x2), max(x1, x2)
-        y1, y2 = min(y1, y2), max(y1, y2)
-        current_crop = frame[y1:y2, x1:x2]
-        # Compute symmetric versions of base images
-        right_base_symmetric = cv2.flip(self.right_base, 1)
-        left_base_symmetric = cv2.flip(self.left_base, 1)
-        if box_idx == 0:
-            right_score = self.get_best_template_match(current_crop, self.right_base)
-            left_score = self.get_best_template_match(current_crop, right_base_symmetric)
-        else:
-            right_score = self.get_best_template_match(current_crop, left_base_symmetric)
-            left_score = self.get_best_template_match(current_crop, self.left_base)
-        warning = ((box_idx == 0 and left_score > right_score) and left_score > self.warning_threshold ) or \
-                ((box_idx == 1 and right_score > left_score) and right_score > self.warning_threshold)
-        results.append({
-            'box': box_idx,
-            'right_score': right_score,
-            'left_score': left_score,
-            'warning': warning
-        })
-        #print("results: ", results)
-        return results
+        return self.test_frames(frame, [box_idx])[0]
+
+    def test_frames(self, frame, box_indices):
+        """
+        Test several boxes of the same frame at once
+
+        Every (box, base image, angle) scoring job is submitted to the match
+        thread pool before any result is awaited.
+
+        Returns:
+            list: one test_frame style result list per box in box_indices
+        """
+        if not self.base_images_loaded:
+            return [None] * len(box_indices)
+
+        pending = []
+        for box_idx in box_indices:
+            box = self.boxes[box_idx]
+            x1, y1 = box[0]
+            x2, y2 = box[1]
+            x1, x2 = min(x1, x2), max(x1, x2)
+            y1, y2 = min(y1, y2), max(y1, y2)
+            if hasattr(self.matcher, 'embed_box'):
+                # Feature engines pool the box from the part model's features instead of cropping pixels
+                current_crop = self.matcher.embed_box(self.frame_features, (x1, y1, x2, y2), frame.shape)
+            else:
+                current_crop = to_gray(frame[y1:y2, x1:x2])
+            if current_crop is None:
+                pending.append((box_idx, None, None))
+                continue
+            # Right box compares against the right base image and its mirror, left box the other way round
+            right_name, left_name = self.template_bank.references_for_box(box_idx)
+            pending.append((box_idx, self._submit_jobs(current_crop, right_name),
+                            self._submit_jobs(current_crop, left_name)))
+
+        all_results = []
+        for box_idx, right_jobs, left_jobs in pending:
+            if right_jobs is None:
+                all_results.append(None)
+                continue
+            right_score = max(job.result() for job in right_jobs)
+            left_score = max(job.result() for job in left_jobs)
+            if hasattr(self.matcher, 'normalize'):
+                right_score, left_score = self.matcher.normalize(right_score, left_score)
+            warning = ((box_idx == 0 and left_score > right_score) and left_score > self.warning_threshold ) or \
+                    ((box_idx == 1 and right_score > left_score) and right_score > self.warning_threshold)
+            all_results.append([{
+                'box': box_idx,
+                'right_score': right_score,
+                'left_score': left_score,
+                'warning': warning
+            }])
+        return all_results
+
+    def take_features(self):
+        """Part model features of the frame just tracked, if the match engine uses them"""
+        if hasattr(self.matcher, 'take_features'):
+            return self.matcher.take_features()
+        return None
+
+    def _submit_jobs(self, crop, reference):
+        """Scoring jobs of one crop against one reference as futures; run inline without a pool"""
+        jobs = self.matcher.jobs(crop, reference)
+        if self.match_executor is not None:
+            return [self.match_executor.submit(job) for job in jobs]
+        futures = []
+        for job in jobs:
+            future = Future()
+            future.set_result(job())
+            futures.append(future)
+        return futures
 
     def crop_and_save(self, box, filename):
         """Save cropped region as base image with an additional 30 pixels margin"""
@@ -199,59 +246,17 @@ class Comparer:
             print(f"Saved {filename}")
             #self.load_base_images()  # Reload base images after saving
 
-    def check_object_in_box(self, box_coords, object_bbox):
-        """Check if detected object is inside a test box"""
-        box_x1, box_y1 = box_coords[0]
-        box_x2, box_y2 = box_coords[1]
-        obj_x1, obj_y1, obj_x2, obj_y2 = object_bbox
-        
-        # Check if object's center point is inside the box
-        obj_center_x = (obj_x1 + obj_x2) / 2
-        obj_center_y = (obj_y1 + obj_y2) / 2
-
-        return (box_x1 <= obj_center_x <= box_x2 and 
-                box_y1 <= obj_center_y <= box_y2)
-
     def check_if_box_is_empty(self, detections):
         """
-        Check if any detected object is inside the specified box
+        Check whether the right and left test boxes are free of detected objects
         
         Args:
-            box (list): Box coordinates in format [(x1,y1), (x2,y2)]
-            detections (tensor): YOLO detection results containing bounding boxes
+            detections (FrameDetections): confident part detections of the current frame
             
         Returns:
-            bool: True if any object is detected in the box, False otherwise
+            tuple: (right box empty, left box empty)
         """
-        box_x1, box_y1 = self.boxes[0][0]
-        box_x2, box_y2 = self.boxes[0][1]
-        box_x3, box_y3 = self.boxes[1][0]
-        box_x4, box_y4 = self.boxes[1][1]
-
-        boxes_empty_status = [True, True]
-
-        for det in detections:
-            # Extract coordinates and confidence
-            x1, y1, x2, y2, conf, cls = det[:6]
-            
-            # Skip low confidence detections
-            if conf < 0.5:
-                continue
-                
-            # Calculate object's center point
-            obj_center_x = (x1 + x2) / 2
-            obj_center_y = (y1 + y2) / 2
-            
-            # Check if object's center is inside the box
-            if (box_x1 <= obj_center_x <= box_x2 and 
-                box_y1 <= obj_center_y <= box_y2):
-                boxes_empty_status[0] = False
-            
-            if (box_x3 <= obj_center_x <= box_x4 and 
-                box_y3 <= obj_center_y <= box_y4):
-                boxes_empty_status[1] = False
-                
-        return boxes_empty_status[0], boxes_empty_status[1]
+        return not detections.in_test_zone(0).any(), not detections.in_test_zone(1).any()
 
     def check_if_object_stable(self, current_bbox, bbox_history):
         """
@@ -282,9 +287,9 @@ class Comparer:
             x1, y1 = box[0]
             x2, y2 = box[1]
             
-            # Draw box
+            # Draw the zone outline
             color = (0, 255, 0) if (i == 0 and self.right_box_color == 0) or (i == 1 and self.left_box_color == 0) else (0, 0, 255)
-            cv2.rectangle(self.frame_display, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
+            cv2.polylines(self.frame_display, [self.test_zones.zones[i]], True, color, 2)
             
             # Add label
             label = "Right Box" if i == 0 else "Left Box"
@@ -306,16 +311,25 @@ class Comparer:
                         cv2.FONT_HERSHEY_SIMPLEX,
                         0.6, (0, 255, 0), 2)
         
-    def compare(self, x1, y1, x2, y2, cls, track_id, current_time):
+    def compare(self, x1, y1, x2, y2, cls, track_id, current_time, pending_tests=None, test_zone=None):
+        """
+        Update box state for one detected part and run the placement test once it is still
+
+        With pending_tests (dict), the test is not run here; instead box_idx -> track_id is
+        recorded so run_pending_tests can test all boxes of the frame in parallel.
+        test_zone is the part's test zone id from FrameDetections; it is looked up when omitted.
+        """
+        if test_zone is None:
+            test_zone = self.test_zones.zone_at((x1 + x2) / 2, (y1 + y2) / 2)
         for box_idx, box in enumerate(self.boxes):
                 #print("left box state: ", self.left_box_state)
                 #print("right box state: ", self.right_box_state)
                 box_data = self.objects_in_boxes[box_idx]
                 if (box_idx == 0 and self.right_box_state == 0) or (box_idx == 1 and self.left_box_state == 0):
-                    if self.check_object_in_box(box, (x1, y1, x2, y2)):
+                    if test_zone == box_idx:
                         # New object detected in box
                         if box_data['object'] is None:
-                            box_data['object'] = cls.item()
+                            box_data['object'] = float(cls)
                             box_data['start_time'] = current_time
                             box_data['test_results'] = []
                             box_data['bbox_history'].clear()
@@ -327,58 +341,11 @@ class Comparer:
                         # Check if object has been still for threshold time
                         if (current_time - box_data['start_time'] >= self.STILL_THRESHOLD):
                             if self.check_if_object_stable(current_bbox, box_data['bbox_history']):
-                                # Run template matching test
-                                results = self.test_frame(self.frame, box_idx=box_idx)
-                                if results:
-                                    #print("results size: ", len(results))
-                                    #print("results[box_idx]['warning']: ", results[box_idx]['warning'])
-                                    box_data['test_results'].append(results[0]['warning'])
-                                    #print("box_data['test_results']: ", box_data['test_results'])
-                                    percentage = (sum(box_data['test_results']) / len(box_data['test_results'])) * 100
-                                    if percentage > 0:  # If there's any warning
-                                        print(f"Wrong placement percentage: {percentage:.1f}% in {'Right' if box_idx == 0 else 'Left'} box")
-                                        print(f"Similarity scores - Right: {results[0]['right_score']:.3f}, Left: {results[0]['left_score']:.3f}")
-                                    
-                                    test_duration_check = len(box_data['test_results']) >= int(self.TEST_DURATION / self.test_interval)
-                                    #print(f"Test duration check: {test_duration_check}")
-                                    #print(f"Current test results length: {len(box_data['test_results'])}")
-                                    #print(f"Required length: {int(self.TEST_DURATION / self.test_interval)}")
-
-                                    # Second condition check
-                                    left_score_check = results[0]['left_score'] > self.warning_threshold
-                                    right_score_check = results[0]['right_score'] > self.warning_threshold
-                                    #print(f"Left score check: {left_score_check} ({results[box_idx]['left_score']} > {self.warning_threshold})")
-                                    #print(f"Right score check: {right_score_check} ({results[box_idx]['right_score']} > {self.warning_threshold})")
-                                    if len(box_data['test_results']) >= int(self.TEST_DURATION / self.test_interval) and (results[0]['left_score'] > self.warning_threshold or results[0]['right_score'] > self.warning_threshold):
-                                        # Calculate if majority of tests showed wrong placement
-                                        #print("CONDITIONS MET: Checking for wrong placement...")
-                                        # print("sum(box_data['test_results']): ", sum(box_data['test_results']))
-                                        # print("len(box_data['test_results']): ", len(box_data['test_results']))
-                                        if (box_idx == 0 and results[0]['left_score'] > results[0]['right_score']) or \
-                                            (box_idx == 1 and results[0]['right_score'] > results[0]['left_score']):
-                                            print(f"WARNING: Wrong object placement detected in {'Right' if box_idx == 0 else 'Left'} box!")
-                                            if box_idx == 0:
-                                                self.index_side_info[track_id] = 2 # part side info assigned as left if object placed to right
-                                                self.index_warning_info[track_id] = 1
-                                                self.right_box_color = 1 # red
-                                                self.logger.log_detection(is_right_side=False, is_successful=False)
-                                            else:
-                                                self.index_side_info[track_id] = 1 # part side info assigned as right if object placed to left
-                                                self.index_warning_info[track_id] = 1
-                                                self.left_box_color = 1 # red
-                                                self.logger.log_detection(is_right_side=True, is_successful=False)
-
-                                        else:
-                                            if box_idx == 0:
-                                                self.logger.log_detection(is_right_side=True, is_successful=True)
-                                            else:
-                                                self.logger.log_detection(is_right_side=False, is_successful=True)
-                                            self.index_side_info[track_id] = box_idx + 1 # part side info assigned if object placed correctly
-                                            self.index_warning_info[track_id] = 1
-                                        if box_idx == 0:
-                                            self.right_box_state = 1 # object processed & waiting for leaving
-                                        else:
-                                            self.left_box_state = 1 # object processed & waiting for leaving
+                                if pending_tests is not None:
+                                    # Tested together with the other boxes once every part has been compared
+                                    pending_tests.setdefault(box_idx, track_id)
+                                else:
+                                    self._apply_test_results(box_idx, track_id, self.test_frame(self.frame, box_idx=box_idx))
                             else:
                                 # Update previous bounding boxf
                                 box_data['prev_bbox'] = (x1, y1, x2, y2)
@@ -394,21 +361,87 @@ class Comparer:
                     # Reset tracking for this box
                     self.objects_in_boxes[box_idx] = {'object': None, 'start_time': 0, 'test_results': [], 'prev_bbox': None, 'bbox_history': deque(maxlen=self.BBOX_HISTORY_SIZE)}
     
+    def _apply_test_results(self, box_idx, track_id, results):
+        """Record a placement test result for a box and decide once enough tests are collected"""
+        if not results:
+            return
+        box_data = self.objects_in_boxes[box_idx]
+        #print("results size: ", len(results))
+        #print("results[box_idx]['warning']: ", results[box_idx]['warning'])
+        box_data['test_results'].append(results[0]['warning'])
+        #print("box_data['test_results']: ", box_data['test_results'])
+        percentage = (sum(box_data['test_results']) / len(box_data['test_results'])) * 100
+        if percentage > 0:  # If there's any warning
+            print(f"Wrong placement percentage: {percentage:.1f}% in {'Right' if box_idx == 0 else 'Left'} box")
+            print(f"Similarity scores - Right: {results[0]['right_score']:.3f}, Left: {results[0]['left_score']:.3f}")
+
+        test_duration_check = len(box_data['test_results']) >= int(self.TEST_DURATION / self.test_interval)
+        #print(f"Test duration check: {test_duration_check}")
+        #print(f"Current test results length: {len(box_data['test_results'])}")
+        #print(f"Required length: {int(self.TEST_DURATION / self.test_interval)}")
+
+        # Second condition check
+        left_score_check = results[0]['left_score'] > self.warning_threshold
+        right_score_check = results[0]['right_score'] > self.warning_threshold
+        #print(f"Left score check: {left_score_check} ({results[box_idx]['left_score']} > {self.warning_threshold})")
+        #print(f"Right score check: {right_score_check} ({results[box_idx]['right_score']} > {self.warning_threshold})")
+        if len(box_data['test_results']) >= int(self.TEST_DURATION / self.test_interval) and (results[0]['left_score'] > self.warning_threshold or results[0]['right_score'] > self.warning_threshold):
+            # Calculate if majority of tests showed wrong placement
+            #print("CONDITIONS MET: Checking for wrong placement...")
+            # print("sum(box_data['test_results']): ", sum(box_data['test_results']))
+            # print("len(box_data['test_results']): ", len(box_data['test_results']))
+            if (box_idx == 0 and results[0]['left_score'] > results[0]['right_score']) or \
+                (box_idx == 1 and results[0]['right_score'] > results[0]['left_score']):
+                print(f"WARNING: Wrong object placement detected in {'Right' if box_idx == 0 else 'Left'} box!")
+                track = self.tracks.get(track_id)
+                if box_idx == 0:
+                    track.side = 2 # part side info assigned as left if object placed to right
+                    track.side_warning = 1
+                    self.right_box_color = 1 # red
+                    self.logger.log_detection(is_right_side=False, is_successful=False)
+                else:
+                    track.side = 1 # part side info assigned as right if object placed to left
+                    track.side_warning = 1
+                    self.left_box_color = 1 # red
+                    self.logger.log_detection(is_right_side=True, is_successful=False)
+
+            else:
+                if box_idx == 0:
+                    self.logger.log_detection(is_right_side=True, is_successful=True)
+                else:
+                    self.logger.log_detection(is_right_side=False, is_successful=True)
+                track = self.tracks.get(track_id)
+                track.side = box_idx + 1 # part side info assigned if object placed correctly
+                track.side_warning = 1
+            if box_idx == 0:
+                self.right_box_state = 1 # object processed & waiting for leaving
+            else:
+                self.left_box_state = 1 # object processed & waiting for leaving
+
+    def run_pending_tests(self, pending_tests):
+        """Run the tests queued by compare for this frame, all boxes at once"""
+        if not pending_tests:
+            return
+        box_indices = list(pending_tests)
+        for box_idx, results in zip(box_indices, self.test_frames(self.frame, box_indices)):
+            self._apply_test_results(box_idx, pending_tests[box_idx], results)
+
     def check(self, x1, x2, track_id):
-        if((x1+x2)/2 > (self.width)/2) and (self.index_side_info[track_id] == 1) and self.index_warning_info[track_id] == 0:
+        track = self.tracks.get(track_id)
+        if((x1+x2)/2 > (self.width)/2) and (track.side == 1) and track.side_warning == 0:
             print("WARNING: RIGHT SIDED OBJECT HAS MOVED OVER THE WRONG SIDE!!!!!!!!!!!!!!!!!!!!!!!!!!!!1")
-            self.index_warning_info[track_id] = 1
+            track.side_warning = 1
             self.logger.update_stats("changed_side_detections", 1)
-        elif((x1+x2)/2 < (self.width)/2) and (self.index_side_info[track_id] == 1) and self.index_warning_info[track_id] == 1:
+        elif((x1+x2)/2 < (self.width)/2) and (track.side == 1) and track.side_warning == 1:
             print("INSIDE FIRST ELIF")
-            self.index_warning_info[track_id] = 0
-        elif((x1+x2)/2 < (self.width)/2) and (self.index_side_info[track_id] == 2) and self.index_warning_info[track_id] == 0:
+            track.side_warning = 0
+        elif((x1+x2)/2 < (self.width)/2) and (track.side == 2) and track.side_warning == 0:
             print("WARNING: LEFT SIDED OBJECT HAS MOVED OVER THE WRONG SIDE!!!!!!!!!!!!!!!!!!!!!!!!!!!!1")
-            self.index_warning_info[track_id] = 1
+            track.side_warning = 1
             self.logger.update_stats("changed_side_detections", 1)
-        elif((x1+x2)/2 > (self.width)/2) and (self.index_side_info[track_id] == 2) and self.index_warning_info[track_id] == 1:
+        elif((x1+x2)/2 > (self.width)/2) and (track.side == 2) and track.side_warning == 1:
             print("INSIDE SECOND ELIF")
-            self.index_warning_info[track_id] = 0
+            track.side_warning = 0
         
 if __name__ == "__main__":
     # Example usage - you would need to provide a valid model path
@@ -6,9 +6,10 @@ import requests
 import cv2
 from PIL import Image, ImageTk
 from pathlib import Path
-from comparer_module import Comparer
+from comparer_module import TEST_BOXES
 from session_operator import SessionOperator
-import time
+from frame_source_module import CameraSource, open_frame_source
+from warmup_module import ModelWarmer
 import os
 from datetime import datetime
 from dotenv import load_dotenv
@@ -16,6 +17,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:8000')
+# Optional replay source (video file, image directory or raw dump) instead of the live camera
+FRAME_SOURCE = os.getenv('FRAME_SOURCE')
+# Run the models in a separate inference process instead of the UI process
+INFERENCE_SERVER = os.getenv('INFERENCE_SERVER', '0').lower() in ('1', 'true', 'yes')
 
 MAIN_PATH = Path(__file__).resolve()
 resources_path = MAIN_PATH.resolve().parent.parent / "resources"
@@ -23,10 +28,7 @@ resources_path = MAIN_PATH.resolve().parent.parent / "resources"
 right_base_image_path = str(resources_path / "base_images/right_base_image.png")
 left_base_image_path = str(resources_path / "base_images/left_base_image.png")
 
-boxes = [
-    [(35, 120), (165, 250)],  # Right box
-    [(450, 120), (580, 250)]   # Left box
-]
+boxes = TEST_BOXES  # Bounding boxes of the right and left test zones
 
 def crop_and_save(box, frame, filename):
     """Save cropped region as base image with an additional margin"""
@@ -60,6 +62,13 @@ class SequenceApp(ttk.Window):
         self.access_token = None
         self.token_type = None
         self.user_info = None
+
+        # Load and warm up models in the background while the operator logs in; with the
+        # inference server the models live in the server process, so the UI loads none
+        self.model_warmer = None if INFERENCE_SERVER else ModelWarmer()
+        if self.model_warmer is not None:
+            self.model_warmer.request()
+        self.warmup_status_id = None
         
         # Configure modern styling
         self.configure_modern_styles()
@@ -413,6 +422,8 @@ class SequenceApp(ttk.Window):
         
         self.selected_model = tk.StringVar(value=model_files[0])
         self.model_cards = {}
+        if self.model_warmer is not None:
+            self.model_warmer.request(models_folder / model_files[0])
         
         # Create scrollable frame for models
         canvas = tk.Canvas(left_panel, highlightthickness=0)
@@ -498,6 +509,8 @@ class SequenceApp(ttk.Window):
         # Click handler
         def select_model():
             self.selected_model.set(model_name)
+            if self.model_warmer is not None:
+                self.model_warmer.request(resources_path / "models" / model_name)
             self._update_model_cards()
             self._update_model_preview()
         
@@ -535,9 +548,36 @@ class SequenceApp(ttk.Window):
             self.preview_label.configure(image="", text="Önizleme mevcut değil")
         
         # Update model info
-        info_text = f"Model: {model_name}\nDosya: {self.selected_model.get()}\nDurum: Hazır"
+        self._update_warmup_status()
+
+    def _update_warmup_status(self):
+        """Show the background warm-up state of the selected model"""
+        try:
+            if not self.model_info_label.winfo_exists():
+                return
+        except (tk.TclError, AttributeError):
+            return
+
+        model_path = resources_path / "models" / self.selected_model.get()
+        status = self.model_warmer.status(model_path) if self.model_warmer is not None else 'server'
+        if status == 'server':
+            status_text = "Çıkarım sunucusunda yüklenecek"
+        elif status == 'ready':
+            status_text = f"Hazır ({self.model_warmer.warmup_time(model_path):.1f} sn)"
+        elif status == 'failed':
+            status_text = "Yüklenemedi"
+        else:
+            status_text = "Hazırlanıyor..."
+        model_name = self.selected_model.get().replace(".pt", "")
+        info_text = f"Model: {model_name}\nDosya: {self.selected_model.get()}\nDurum: {status_text}"
         self.model_info_label.configure(text=info_text)
 
+        if self.warmup_status_id is not None:
+            self.after_cancel(self.warmup_status_id)
+        self.warmup_status_id = None
+        if status == 'warming':
+            self.warmup_status_id = self.after(250, self._update_warmup_status)
+
     def _confirm_model_selection(self):
         """Confirm model selection and proceed"""
         self.selected_model_path = resources_path / "models" / self.selected_model.get()
@@ -678,10 +718,18 @@ class SequenceApp(ttk.Window):
         self.video_label = ttk.Label(center_frame, relief="flat")
         self.video_label.grid(row=0, column=0)
         
-        # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(0)  # Fallback to default camera
+        # Initialize the same frame source the session will use, so base images match it
+        try:
+            self.cap = open_frame_source(FRAME_SOURCE, realtime=True) if FRAME_SOURCE else CameraSource()
+        except (RuntimeError, OSError, ValueError) as e:
+            print(f"Failed to open frame source: {e}")
+            self.cap = None
+
+        # Re-warm at the source's real resolution if it differs from the default
+        if self.model_warmer is not None and self.cap is not None and self.cap.isOpened():
+            ret, frame = self.cap.read()
+            if ret:
+                self.model_warmer.request(self.selected_model_path, frame_shape=frame.shape)
         
         # Controls
         controls_frame = ttk.Frame(main_container)
@@ -934,6 +982,24 @@ class SequenceApp(ttk.Window):
         operation_container = ttk.Frame(operation_frame)
         operation_container.pack(fill="both", expand=True)
         
+        # Finish any warm-up still in flight so the session never shares a model with it;
+        # poll instead of blocking so the window keeps responding meanwhile
+        loading_label = ttk.Label(operation_container, text="Modeller hazırlanıyor...",
+                                  font=("Segoe UI", 14))
+        loading_label.pack(expand=True)
+        self._start_session_when_warm(operation_container, loading_label)
+
+    def _start_session_when_warm(self, operation_container, loading_label):
+        """Start the session once the model warmer is idle, checking again every 100 ms"""
+        self.warmup_status_id = None
+        if self.model_warmer is not None and not self.model_warmer.wait(timeout=0):
+            self.warmup_status_id = self.after(100, self._start_session_when_warm,
+                                               operation_container, loading_label)
+            return
+        loading_label.destroy()
+
+        frame_source = open_frame_source(FRAME_SOURCE, realtime=True) if FRAME_SOURCE else None
+
         # Initialize session operator with the selected model
         self.detection_and_comparison = SessionOperator(
             tkinter_frame=operation_container,
@@ -942,7 +1008,9 @@ class SequenceApp(ttk.Window):
             right_base_image_path=right_base_image_path,
             left_base_image_path=left_base_image_path,
             user_info=self.user_info,
-            access_token=self.access_token
+            access_token=self.access_token,
+            frame_source=frame_source,
+            use_inference_server=INFERENCE_SERVER
         )
         self.detection_and_comparison.run()
 
@@ -959,6 +1027,14 @@ class SequenceApp(ttk.Window):
 
     def _prepare_screen_transition(self):
         """Prepare for screen transition by cleaning up resources"""
+        # Cancel warm-up status polling and a session start still waiting for the warmer
+        if self.warmup_status_id is not None:
+            try:
+                self.after_cancel(self.warmup_status_id)
+            except ValueError:
+                pass
+            self.warmup_status_id = None
+
         # Cancel datetime updates
         if hasattr(self, 'datetime_update_id') and self.datetime_update_id is not None:
             try:
@@ -986,6 +1062,12 @@ class SequenceApp(ttk.Window):
 
     def on_closing(self):
         """Handle application closing"""
+        if self.warmup_status_id is not None:
+            try:
+                self.after_cancel(self.warmup_status_id)
+            except ValueError:
+                pass
+
         if hasattr(self, 'datetime_update_id') and self.datetime_update_id is not None:
             try:
                 self.after_cancel(self.datetime_update_id)
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class FrameDetections:
+    """
+    Confident part detections of one frame as contiguous NumPy arrays
+
+    The ultralytics boxes tensor is moved to the host once per frame and
+    split into columns; low-confidence boxes are dropped up front and box
+    centres, vertical sections and test zones are looked up for all parts at
+    once, so consumers never touch per-box tensors.
+    """
+
+    def __init__(self, xyxy, conf, cls, ids, sections=None, test_zones=None):
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.ascontiguousarray(conf, dtype=np.float32)
+        self.cls = np.ascontiguousarray(cls, dtype=np.float32)
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64)  # 0 for untracked parts
+        self.centers = (self.xyxy[:, :2] + self.xyxy[:, 2:]) / 2
+        # Zone ids from ZoneLayout lookups, -1 = none
+        self.section_count = len(sections) if sections is not None else 0
+        self.sections = self._zones(sections)
+        self.test_zones = self._zones(test_zones)
+
+    def _zones(self, layout):
+        if layout is None:
+            return np.full(len(self.xyxy), -1, dtype=np.int64)
+        return layout.zone_of(self.centers)
+
+    @classmethod
+    def from_boxes_data(cls, data, sections=None, test_zones=None, min_conf=0.5):
+        """
+        Build from an ultralytics boxes.data array
+
+        Args:
+            data: (N, 7) x1, y1, x2, y2, id, conf, cls for tracked results or (N, 6) without id
+            sections: ZoneLayout of the vertical sections
+            test_zones: ZoneLayout of the test boxes
+            min_conf: detections below this confidence are dropped
+        """
+        data = np.asarray(data, dtype=np.float32)
+        if data.shape[1] == 7:
+            ids, conf, classes = data[:, 4], data[:, 5], data[:, 6]
+        else:
+            ids, conf, classes = np.zeros(len(data), dtype=np.float32), data[:, 4], data[:, 5]
+        keep = conf >= min_conf
+        return cls(data[keep, :4], conf[keep], classes[keep], ids[keep], sections, test_zones)
+
+    @classmethod
+    def from_results(cls, results, sections=None, test_zones=None, min_conf=0.5):
+        """Build from the result list returned by model.track or model.predict"""
+        return cls.from_boxes_data(results[0].boxes.data.cpu().numpy(), sections, test_zones, min_conf)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    def section_counts(self):
+        """Number of parts whose centre lies in each vertical section"""
+        return np.bincount(self.sections[self.sections >= 0], minlength=self.section_count)
+
+    def in_test_zone(self, zone_id):
+        """Mask of parts whose centre lies inside test zone zone_id"""
+        return self.test_zones == zone_id
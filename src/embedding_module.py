@@ -0,0 +1,108 @@
+from functools import partial
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torchvision.ops import roi_align
+from template_module import MATCHERS
+
+PAD_VALUE = 114  # Letterbox fill used by ultralytics
+
+
+class EmbeddingMatcher:
+    """
+    Left/right classification from the part model's own feature maps
+
+    A forward hook on one backbone layer of the tracking model keeps the
+    feature map of the last tracked frame. A test box is pooled from it with
+    roi_align into a small spatial grid (so mirror images stay distinct) and
+    compared by cosine similarity with embeddings of the base images and
+    their mirrors, computed once. No extra image pass runs per test, and the
+    learned features are less sensitive to lighting than grayscale
+    correlation.
+    """
+
+    needs_model = True
+
+    def __init__(self, bank, right_base, left_base, model, layer=6, pool_size=(4, 4), box_size=(130, 130)):
+        self.bank = bank
+        self.pool_size = pool_size
+        self.passes = 0
+        self.network = model.model  # Underlying torch DetectionModel
+        self._input_shape = None
+        self._features = None
+        self._handles = [
+            self.network.register_forward_pre_hook(self._record_input),
+            self.network.model[layer].register_forward_hook(self._record_features),
+        ]
+        self.embeddings = {
+            'right': self._embed_base(right_base, box_size),
+            'right_mirror': self._embed_base(cv2.flip(right_base, 1), box_size),
+            'left': self._embed_base(left_base, box_size),
+            'left_mirror': self._embed_base(cv2.flip(left_base, 1), box_size),
+        }
+
+    def _record_input(self, module, inputs):
+        self._input_shape = tuple(inputs[0].shape[-2:])
+
+    def _record_features(self, module, inputs, output):
+        self._features = (output.detach(), self._input_shape)
+
+    def take_features(self):
+        """Features of the most recent forward pass, as (feature map, network input (h, w))"""
+        features, self._features = self._features, None
+        return features
+
+    def _embed_base(self, image, box_size):
+        """Run the network on a base image and pool its central test-box-sized region"""
+        height, width = image.shape[:2]
+        stride = int(max(self.network.stride)) if hasattr(self.network, 'stride') else 32
+        padded = cv2.copyMakeBorder(image, 0, (-height) % stride, 0, (-width) % stride,
+                                    cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3)
+        parameter = next(self.network.parameters())
+        tensor = torch.from_numpy(np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1)))
+        tensor = tensor.to(parameter.device, parameter.dtype).unsqueeze(0) / 255
+        with torch.no_grad():
+            self.network(tensor)
+        features = self.take_features()
+
+        box_w, box_h = min(box_size[0], width), min(box_size[1], height)
+        x1, y1 = (width - box_w) / 2, (height - box_h) / 2
+        return self._pool(features, (x1, y1, x1 + box_w, y1 + box_h), padded.shape)
+
+    def _pool(self, features, box, frame_shape):
+        """L2-normalized roi_align embedding of a frame-space box"""
+        feature_map, (input_h, input_w) = features
+        height, width = frame_shape[:2]
+        # Undo the letterbox: uniform scale plus centred padding
+        ratio = min(input_h / height, input_w / width)
+        pad_x = (input_w - round(width * ratio)) / 2
+        pad_y = (input_h - round(height * ratio)) / 2
+        x1, y1, x2, y2 = box
+        roi = torch.tensor([[0, x1 * ratio + pad_x, y1 * ratio + pad_y, x2 * ratio + pad_x, y2 * ratio + pad_y]],
+                           dtype=feature_map.dtype, device=feature_map.device)
+        pooled = roi_align(feature_map, roi, output_size=self.pool_size,
+                           spatial_scale=feature_map.shape[-1] / input_w, sampling_ratio=2, aligned=True)
+        return F.normalize(pooled.flatten(1).float(), dim=1)[0]
+
+    def embed_box(self, features, box, frame_shape):
+        """Embedding of a test box from a frame's features, or None if the frame has none"""
+        if features is None:
+            return None
+        return self._pool(features, box, frame_shape)
+
+    def score(self, embedding, reference):
+        self.passes += 1
+        return float(torch.dot(embedding, self.embeddings[reference]))
+
+    def jobs(self, embedding, reference):
+        return [partial(self.score, embedding, reference)]
+
+    def close(self):
+        """Remove the hooks from the shared model"""
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+
+MATCHERS['embedding'] = EmbeddingMatcher
@@ -0,0 +1,218 @@
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+import cv2
+from pathlib import Path
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+RAW_EXTENSIONS = {".raw", ".bin", ".npy"}
+
+
+class FrameSource(ABC):
+    """
+    Base class for frame sources with a cv2.VideoCapture-compatible interface
+
+    Subclasses implement read(). File-backed sources can either deliver
+    frames as fast as possible or pace them to their nominal frame rate
+    with _pace().
+    """
+
+    def __init__(self, fps=30.0, realtime=False):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.frames_read = 0
+        self._start_time = None
+
+    def _pace(self):
+        """Sleep until the current frame is due when running in real-time mode"""
+        if not self.realtime:
+            return
+        if self._start_time is None:
+            self._start_time = time.time()
+            return
+        due_time = self._start_time + self.frames_read / self.fps
+        delay = due_time - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    @abstractmethod
+    def read(self, image=None):
+        """
+        Read the next frame
+
+        Args:
+            image: optional preallocated array to copy the frame into
+
+        Returns:
+            tuple: (ret, frame) like cv2.VideoCapture.read()
+        """
+
+    def isOpened(self):
+        return True
+
+    def get_fps(self):
+        return self.fps
+
+    def release(self):
+        pass
+
+
+class DecodedFrameSource(FrameSource):
+    """Source that produces each frame itself; subclasses implement _read_frame() and read() paces and copies"""
+
+    @abstractmethod
+    def _read_frame(self):
+        """The next frame as an array, or None at the end"""
+
+    def read(self, image=None):
+        self._pace()
+        frame = self._read_frame()
+        if frame is None:
+            return False, None
+        self.frames_read += 1
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+
+class CameraSource(FrameSource):
+    """Live camera, trying each index in turn until one delivers a frame"""
+
+    def __init__(self, indices=(0, 1, 2, 4)):
+        super().__init__(realtime=False)
+        self.cap = None
+        self.index = None
+        for cam_idx in indices:
+            print(f"Trying camera index {cam_idx}...")
+            cap = cv2.VideoCapture(cam_idx)
+            if cap.isOpened():
+                ret, _ = cap.read()
+                if ret:
+                    print(f"Successfully connected to camera index {cam_idx}")
+                    self.cap = cap
+                    self.index = cam_idx
+                    break
+            cap.release()
+
+        if self.cap is None:
+            raise RuntimeError(f"Failed to grab a frame from any camera (tried indices {list(indices)}).")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def read(self, image=None):
+        # The camera paces itself; hand the buffer straight to OpenCV
+        if image is not None:
+            return self.cap.read(image)
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, e.g. resources/test_video/test_video.webm"""
+
+    def __init__(self, path, realtime=False):
+        self.path = str(path)
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Failed to open video file: {self.path}")
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS), realtime=realtime)
+
+    def read(self, image=None):
+        self._pace()
+        ret, frame = self.cap.read(image) if image is not None else self.cap.read()
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(DecodedFrameSource):
+    """Directory of still images replayed in file name order"""
+
+    def __init__(self, directory, fps=30.0, realtime=False, loop=False):
+        super().__init__(fps=fps, realtime=realtime)
+        self.directory = Path(directory)
+        self.paths = sorted(p for p in self.directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        if not self.paths:
+            raise RuntimeError(f"No images found in {self.directory}")
+        self.loop = loop
+        self.position = 0
+
+    def _read_frame(self):
+        while True:
+            if self.position >= len(self.paths):
+                if not self.loop:
+                    return None
+                self.position = 0
+            path = self.paths[self.position]
+            self.position += 1
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                return frame
+            print(f"Skipping unreadable image: {path}")
+
+
+class RawFrameDumpSource(DecodedFrameSource):
+    """
+    Raw BGR frame dump, memory-mapped so frames are never decoded
+
+    Accepts either a .npy array of shape (N, H, W, 3) or a headerless file of
+    concatenated uint8 frames, in which case width and height are required.
+    """
+
+    def __init__(self, path, width=None, height=None, channels=3, fps=30.0, realtime=False):
+        super().__init__(fps=fps, realtime=realtime)
+        self.path = Path(path)
+        if self.path.suffix.lower() == ".npy":
+            self.frames = np.load(self.path, mmap_mode='r')
+        else:
+            if width is None or height is None:
+                raise ValueError("Raw frame dumps need width and height")
+            frame_size = width * height * channels
+            frame_count = self.path.stat().st_size // frame_size
+            self.frames = np.memmap(self.path, dtype=np.uint8, mode='r',
+                                    shape=(frame_count, height, width, channels))
+        self.position = 0
+
+    def _read_frame(self):
+        if self.position >= len(self.frames):
+            return None
+        frame = np.array(self.frames[self.position])
+        self.position += 1
+        return frame
+
+    def release(self):
+        self.frames = None
+
+
+def open_frame_source(spec, realtime=False, **kwargs):
+    """
+    Create a frame source from a camera index or a file system path
+
+    Args:
+        spec: camera index (int or digit string), video file, image directory or raw dump
+        realtime (bool): pace file sources to their frame rate instead of running flat out
+        **kwargs: extra arguments for the selected source (fps, width, height, loop...)
+
+    Returns:
+        FrameSource: the opened source
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(indices=(int(spec),))
+
+    path = Path(spec)
+    if path.is_dir():
+        return ImageDirectorySource(path, realtime=realtime, **kwargs)
+    if path.suffix.lower() in RAW_EXTENSIONS:
+        return RawFrameDumpSource(path, realtime=realtime, **kwargs)
+    return VideoFileSource(path, realtime=realtime)
@@ -0,0 +1,206 @@
+import itertools
+import multiprocessing
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedFrameRing:
+    """Fixed-shape frame slots in shared memory, visible to both processes without copies"""
+
+    def __init__(self, frame_shape, slots=8, name=None):
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        size = int(np.prod(self.frame_shape)) * slots
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def slot(self, index):
+        return self.frames[index % self.slots]
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _serve(model_path, ring_name, frame_shape, slots, request_queue, response_queue):
+    """Inference process main loop: answers track, predict and sticker requests on shared-memory frames"""
+    # Imported here so only the server process loads torch and the models
+    from model_registry import get_model
+    from sticker_module import detect_stickers
+
+    ring = SharedFrameRing(frame_shape, slots, name=ring_name)
+    try:
+        model = get_model(model_path)
+        response_queue.put(('ready', None, {int(k): v for k, v in model.names.items()}))
+    except Exception as e:
+        response_queue.put(('error', None, f"Failed to load {model_path}: {e}"))
+        ring.close()
+        return
+
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        op, request_id, slot = request[:3]
+        frame = ring.slot(slot)  # View into shared memory, no copy
+        try:
+            if op == 'track':
+                boxes = model.track(frame, verbose=False, persist=True)[0].boxes
+                # (N, 7) x1, y1, x2, y2, id, conf, cls when tracked, (N, 6) otherwise
+                result = boxes.data.cpu().numpy()
+            elif op == 'predict':
+                # Untracked (N, 6) detections for a tracker running in the UI process
+                result = model.predict(frame, verbose=False)[0].boxes.data.cpu().numpy()
+            elif op == 'stickers':
+                part_boxes, conf_threshold = request[3:5]
+                result = detect_stickers(frame, conf_threshold=conf_threshold, part_boxes=part_boxes)
+            else:
+                raise ValueError(f"Unknown inference request: {op}")
+            response_queue.put(('result', request_id, result))
+        except Exception as e:
+            traceback.print_exc()
+            response_queue.put(('error', request_id, str(e)))
+
+    ring.close()
+
+
+class InferenceServer:
+    """
+    Hosts the part and sticker models in a separate process
+
+    Frames are written once into shared-memory ring slots; only a small
+    request tuple crosses the process boundary, and compact detection
+    arrays come back. Inference therefore no longer competes with the Tk
+    event loop for the GIL. Requests and responses carry ids, so the
+    protocol can later be extended to serve several UI processes.
+    """
+
+    def __init__(self, model_path, frame_shape, slots=8, startup_timeout=120.0, request_timeout=30.0):
+        self.model_path = str(model_path)
+        self.request_timeout = request_timeout
+        self.ring = SharedFrameRing(frame_shape, slots)
+        self.startup_timeout = startup_timeout
+        context = multiprocessing.get_context("spawn")
+        self.request_queue = context.Queue()
+        self.response_queue = context.Queue()
+        self.process = context.Process(
+            target=_serve,
+            args=(self.model_path, self.ring.name, self.ring.frame_shape, slots,
+                  self.request_queue, self.response_queue),
+            name="InferenceServer",
+            daemon=True
+        )
+        self.names = None
+
+    def start(self):
+        """Start the server process and wait until its models are loaded"""
+        start_time = time.time()
+        self.process.start()
+        status, _, payload = self.response_queue.get(timeout=self.startup_timeout)
+        if status != 'ready':
+            self.stop()
+            raise RuntimeError(payload)
+        self.names = payload
+        print(f"Inference server ready in {time.time() - start_time:.2f}s (pid {self.process.pid})")
+        return InferenceClient(self)
+
+    def stop(self):
+        if self.process.is_alive():
+            self.request_queue.put(None)
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.ring.close()
+
+
+class InferenceClient:
+    """
+    Thread-safe client for an InferenceServer
+
+    track() copies a frame into the next ring slot and returns a token that
+    later sticker requests for the same frame reuse, so the frame crosses
+    into shared memory only once. The ring has more slots than frames the
+    pipeline keeps in flight, so a token stays valid until its packet is done.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.names = server.names
+        self._request_ids = itertools.count()
+        self._slots = itertools.count()
+        self._pending = {}  # request id -> Future
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, name="InferenceClient", daemon=True)
+        self._reader.start()
+
+    def _read_responses(self):
+        while True:
+            try:
+                status, request_id, payload = self.server.response_queue.get()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if status == 'result':
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(f"Inference server error: {payload}"))
+
+    def _request(self, op, slot, *args):
+        future = Future()
+        with self._lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+        self.server.request_queue.put((op, request_id, slot) + args)
+        try:
+            return future.result(timeout=self.server.request_timeout)
+        except TimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise RuntimeError(f"Inference server did not answer {op} within {self.server.request_timeout}s")
+
+    def upload(self, frame):
+        """Copy a frame into the next ring slot; returns its token for later requests"""
+        ring = self.server.ring
+        if frame.shape != ring.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match server ring {ring.frame_shape}")
+        with self._lock:
+            slot = next(self._slots) % ring.slots
+        np.copyto(ring.slot(slot), frame)
+        return slot
+
+    def track(self, frame):
+        """
+        Run part tracking on a frame in the server process
+
+        Returns:
+            tuple: (token, boxes_data) where boxes_data is the (N, 6|7) ultralytics boxes array
+        """
+        slot = self.upload(frame)
+        return slot, self._request('track', slot)
+
+    def predict(self, frame):
+        """Run part detection without tracking; returns (token, (N, 6) boxes_data)"""
+        slot = self.upload(frame)
+        return slot, self._request('predict', slot)
+
+    def detect_stickers(self, token, part_boxes=None, conf_threshold=0.7):
+        """Detect stickers on the frame behind token; returns (left, right) (N, 5) arrays"""
+        return self._request('stickers', token, part_boxes, conf_threshold)
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+MODEL_CACHE_MB = int(os.getenv('MODEL_CACHE_MB', '2048'))
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 of a file's contents"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def load_yolo_model(path, device=None):
+    """Default loader: an ultralytics YOLO model, optionally moved to a device"""
+    from ultralytics import YOLO
+    model = YOLO(str(path))
+    if device is not None:
+        model = model.to(device)
+    return model
+
+
+def estimate_model_bytes(model, path):
+    """Resident size of a model's parameters and buffers, falling back to its file size"""
+    module = getattr(model, 'model', model)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except (AttributeError, TypeError):
+        return Path(path).stat().st_size
+
+
+def reset_tracker(model):
+    """Clear persisted tracker state so a reused model starts with fresh track ids"""
+    predictor = getattr(model, 'predictor', None)
+    for tracker in getattr(predictor, 'trackers', None) or []:
+        tracker.reset()
+
+
+class ModelEntry:
+    __slots__ = ('key', 'path', 'model', 'load_time', 'resident_bytes', 'hits', 'last_used')
+
+    def __init__(self, key, path, model, load_time, resident_bytes):
+        self.key = key
+        self.path = path
+        self.model = model
+        self.load_time = load_time
+        self.resident_bytes = resident_bytes
+        self.hits = 0
+        self.last_used = time.time()
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by path, file hash and device
+
+    Models are loaded lazily on first use and kept warm across sessions.
+    When the estimated resident size exceeds the memory cap, the least
+    recently used models are evicted.
+    """
+
+    def __init__(self, memory_cap_bytes=MODEL_CACHE_MB * 1024 * 1024, loader=load_yolo_model):
+        self.memory_cap_bytes = memory_cap_bytes
+        self.loader = loader
+        self.entries = OrderedDict()  # key -> ModelEntry, least recently used first
+        self.evictions = 0
+        self._hashes = {}  # (path, mtime, size) -> file hash, so unchanged files are hashed once
+        self._lock = threading.RLock()
+        self._loading = {}  # key -> Lock, so concurrent callers share one load
+
+    def _key(self, path, device):
+        resolved = str(Path(path).resolve())
+        stat = os.stat(resolved)
+        stamp = (resolved, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._hashes.get(stamp)
+        if digest is None:
+            digest = file_hash(resolved)
+            with self._lock:
+                self._hashes[stamp] = digest
+        return (resolved, digest, str(device) if device is not None else None)
+
+    def get(self, path, device=None):
+        """Return a warm model for path, loading it if it is not resident"""
+        key = self._key(path, device)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return self._touch(entry).model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    return self._touch(entry).model
+
+            start_time = time.time()
+            model = self.loader(key[0], device)
+            load_time = time.time() - start_time
+            entry = ModelEntry(key, key[0], model, load_time, estimate_model_bytes(model, key[0]))
+            print(f"Loaded model {Path(key[0]).name} in {load_time:.2f}s "
+                  f"({entry.resident_bytes / (1024 * 1024):.1f} MB resident)")
+
+            with self._lock:
+                self.entries[key] = entry
+                self._loading.pop(key, None)
+                self._evict_over_cap(keep=key)
+        return model
+
+    def _touch(self, entry):
+        entry.hits += 1
+        entry.last_used = time.time()
+        self.entries.move_to_end(entry.key)
+        return entry
+
+    def _evict_over_cap(self, keep):
+        while self.resident_bytes() > self.memory_cap_bytes and len(self.entries) > 1:
+            oldest_key = next(iter(self.entries))
+            if oldest_key == keep:
+                break
+            entry = self.entries.pop(oldest_key)
+            self.evictions += 1
+            print(f"Evicted model {Path(entry.path).name} "
+                  f"({entry.resident_bytes / (1024 * 1024):.1f} MB) to stay under the memory cap")
+
+    def is_loaded(self, path, device=None):
+        with self._lock:
+            return self._key(path, device) in self.entries
+
+    def unload(self, path, device=None):
+        """Drop a model from the registry; sessions still holding it keep their reference"""
+        with self._lock:
+            return self.entries.pop(self._key(path, device), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(entry.resident_bytes for entry in self.entries.values())
+
+    def stats(self):
+        """Load time, resident size and reuse count of every cached model"""
+        with self._lock:
+            return {
+                'models': [
+                    {
+                        'path': entry.path,
+                        'device': entry.key[2],
+                        'load_time': entry.load_time,
+                        'resident_mb': entry.resident_bytes / (1024 * 1024),
+                        'hits': entry.hits
+                    }
+                    for entry in self.entries.values()
+                ],
+                'resident_mb': self.resident_bytes() / (1024 * 1024),
+                'memory_cap_mb': self.memory_cap_bytes / (1024 * 1024),
+                'evictions': self.evictions
+            }
+
+
+# Shared by every session in this process
+registry = ModelRegistry()
+
+
+def get_model(path, device=None):
+    """Return a warm model from the shared registry"""
+    return registry.get(path, device)
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap frame-difference gate that throttles inference while the belt is static
+
+    Each frame is downsampled and compared with a reference frame: the frame
+    at which the current run of motionless frames began. Comparing against
+    that anchor rather than the previous frame lets slow belt motion add up
+    until it crosses the threshold, instead of staying under it pair by pair.
+    After idle_after frames without motion the gate goes idle and only lets
+    every idle_interval-th frame through to inference. Any motion returns it
+    to full rate on that same frame and becomes the new reference.
+    """
+
+    def __init__(self, scale=8, pixel_threshold=25, motion_ratio=0.002, idle_after=30, idle_interval=15):
+        self.scale = scale  # Downsampling factor for the difference image
+        self.pixel_threshold = pixel_threshold  # Grey-level change counted as motion
+        self.motion_ratio = motion_ratio  # Fraction of changed pixels that means motion
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.is_idle = False
+        self.reference = None  # Downsampled frame the current static run started at
+        self.static_frames = 0
+        self.idle_skip_counter = 0
+
+        # Statistics
+        self.frames = 0
+        self.skipped_frames = 0
+        self.idle_periods = 0
+
+    def _downsample(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        height, width = gray.shape[:2]
+        small = cv2.resize(gray, (max(1, width // self.scale), max(1, height // self.scale)),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def has_motion(self, frame):
+        """Compare frame with the reference frame; a moving frame becomes the new reference"""
+        small = self._downsample(frame)
+        if self.reference is None or self.reference.shape != small.shape:
+            self.reference = small
+            return True
+        changed = np.count_nonzero(cv2.absdiff(small, self.reference) > self.pixel_threshold)
+        if changed > self.motion_ratio * small.size:
+            self.reference = small
+            return True
+        return False
+
+    def update(self, frame):
+        """
+        Feed a frame through the gate
+
+        Returns:
+            bool: True if inference should run on this frame
+        """
+        self.frames += 1
+        if self.has_motion(frame):
+            self.static_frames = 0
+            if self.is_idle:
+                self.is_idle = False
+                print("Motion detected, resuming full-rate inference")
+            return True
+
+        self.static_frames += 1
+        if not self.is_idle and self.static_frames >= self.idle_after:
+            self.is_idle = True
+            self.idle_periods += 1
+            self.idle_skip_counter = 0
+            print(f"No motion for {self.static_frames} frames, conveyor idle: throttling inference")
+
+        if self.is_idle:
+            self.idle_skip_counter += 1
+            if self.idle_skip_counter % self.idle_interval != 0:
+                self.skipped_frames += 1
+                return False
+        return True
+
+    def reset(self):
+        self.reference = None
+        self.static_frames = 0
+        self.is_idle = False
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'skipped_frames': self.skipped_frames,
+            'skipped_ratio': self.skipped_frames / self.frames if self.frames else 0.0,
+            'idle_periods': self.idle_periods,
+            'is_idle': self.is_idle
+        }
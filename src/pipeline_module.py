@@ -0,0 +1,195 @@
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class PipelineClosed(Exception):
+    """Raised by DropOldestQueue.get() once the queue is closed and drained"""
+
+
+class DropOldestQueue:
+    """Bounded queue that discards its oldest item instead of blocking the producer"""
+
+    def __init__(self, maxsize=2):
+        self.items = deque()
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        self.not_empty = threading.Condition()
+
+    def put(self, item):
+        """Add an item, returning True if an older item had to be dropped"""
+        with self.not_empty:
+            dropped = False
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+                dropped = True
+            self.items.append(item)
+            self.not_empty.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """Pop the oldest item, or None if nothing arrived before the timeout"""
+        with self.not_empty:
+            if not self.items and not self.closed:
+                self.not_empty.wait(timeout)
+            if self.items:
+                return self.items.popleft()
+            if self.closed:
+                raise PipelineClosed()
+            return None
+
+    def get_latest(self):
+        """Pop the newest item and discard everything older, non-blocking"""
+        with self.not_empty:
+            if not self.items:
+                return None
+            item = self.items.pop()
+            self.dropped += len(self.items)
+            self.items.clear()
+            return item
+
+    def close(self):
+        with self.not_empty:
+            self.closed = True
+            self.not_empty.notify_all()
+
+
+class PipelineStage:
+    """One worker thread applying func to every packet between two queues"""
+
+    def __init__(self, name, func, input_queue, output_queue):
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"Pipeline-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            try:
+                packet = self.input_queue.get(timeout=0.1)
+            except PipelineClosed:
+                break
+            if packet is None:
+                continue
+
+            stage_start = time.time()
+            try:
+                packet = self.func(packet)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error in pipeline stage '{self.name}': {e}")
+                traceback.print_exc()
+                continue
+            stage_duration = time.time() - stage_start
+            self.busy_time += stage_duration
+            self.processed += 1
+
+            if packet is not None:
+                packet['processing_time'] = packet.get('processing_time', 0.0) + stage_duration
+                self.output_queue.put(packet)
+
+        self.output_queue.close()
+
+
+class FramePipeline:
+    """
+    Runs frame processing stages concurrently, each on its own worker thread
+
+    Frames are pulled from a CameraCapture-like source and passed between
+    stages as dict packets through bounded drop-oldest queues, so a slow
+    stage sheds stale frames instead of building up latency.
+    """
+
+    def __init__(self, capture, stages, queue_size=1):
+        """
+        Args:
+            capture: object with latest(timeout) and is_alive() (see capture_module.CameraCapture)
+            stages (list): (name, func) pairs; func takes and returns a packet dict
+            queue_size (int): capacity of each inter-stage queue
+        """
+        self.capture = capture
+        self.queues = [DropOldestQueue(queue_size) for _ in range(len(stages) + 1)]
+        self.stages = [
+            PipelineStage(name, func, self.queues[i], self.queues[i + 1])
+            for i, (name, func) in enumerate(stages)
+        ]
+        self.frame_index = 0
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+        self._feeder = threading.Thread(target=self._feed, name="Pipeline-capture", daemon=True)
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        self._feeder.start()
+
+    def _feed(self):
+        while not self._stop_event.is_set():
+            if self._paused.is_set():
+                time.sleep(0.05)
+                continue
+            packet = self.capture.latest(timeout=0.1)
+            if packet is None:
+                if not self.capture.is_alive():
+                    break
+                continue
+            frame, capture_time = packet
+            self.queues[0].put({
+                'index': self.frame_index,
+                'frame': frame,
+                'capture_time': capture_time,
+                'processing_time': 0.0
+            })
+            self.frame_index += 1
+        self.queues[0].close()
+
+    def pause(self):
+        """Stop feeding new frames; packets already in flight still complete"""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def latest_result(self):
+        """Newest fully processed packet, or None if none is ready"""
+        return self.queues[-1].get_latest()
+
+    def is_alive(self):
+        """False once the source has ended and every stage has drained"""
+        return self._feeder.is_alive() or any(stage.is_alive() for stage in self.stages)
+
+    def stats(self):
+        """Per-stage throughput and drop counters"""
+        stats = {'frames_fed': self.frame_index, 'stages': {}}
+        for stage, queue in zip(self.stages, self.queues):
+            stats['stages'][stage.name] = {
+                'processed': stage.processed,
+                'errors': stage.errors,
+                'dropped_before': queue.dropped,
+                'avg_time': stage.busy_time / stage.processed if stage.processed else 0.0
+            }
+        stats['dropped_before_display'] = self.queues[-1].dropped
+        return stats
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        self._feeder.join(timeout)
+        for stage in self.stages:
+            stage.join(timeout)
+        print(f"Pipeline stopped: {self.stats()}")
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class SectionOccupancy:
+    """
+    Object and sticker counts of the vertical sections, kept incrementally
+
+    Every section holds the set of track ids counted in it and a streak of
+    frames without any part detection. A frame's detections are applied in
+    one pass: only tracks that enter or change section touch the sets, and a
+    section whose streak reaches empty_reset_frames drops its members. The
+    counts live in `sections` ({section: {'objects': n, 'stickers': m}}),
+    the layout the grid overlay draws.
+    """
+
+    def __init__(self, tracks, layout, empty_reset_frames=30):
+        self.tracks = tracks  # TrackStateStore whose records carry counted/current_section
+        self.layout = layout  # ZoneLayout of the sections
+        section_count = len(layout)
+        self.section_count = section_count
+        self.empty_reset_frames = empty_reset_frames
+        self.members = [set() for _ in range(section_count)]
+        self.empty_streaks = [0] * section_count
+        self.sections = {section_id: {'objects': 0, 'stickers': 0} for section_id in range(section_count)}
+        self.resets = 0
+
+    def update(self, detections):
+        """Apply one frame's part detections (a FrameDetections)"""
+        for track_id, section in zip(detections.ids.tolist(), detections.sections.tolist()):
+            self.move(self.tracks.get(track_id), section if section >= 0 else None)
+
+        occupied = detections.section_counts() > 0
+        for section_id, is_occupied in enumerate(occupied.tolist()):
+            if is_occupied:
+                self.empty_streaks[section_id] = 0
+                continue
+            self.empty_streaks[section_id] += 1
+            # A tracker losing a part leaves it counted; a section without detections for a while is reset
+            if self.empty_streaks[section_id] >= self.empty_reset_frames:
+                if self.members[section_id]:
+                    print(f"Section {section_id} has no detections for {self.empty_streaks[section_id]} frames, "
+                          f"resetting object count from {len(self.members[section_id])} to 0")
+                    self.clear_section(section_id)
+                    self.resets += 1
+                self.empty_streaks[section_id] = 0
+
+    def move(self, record, section):
+        """Count a track in section (None = outside every section)"""
+        if record.counted:
+            if record.current_section == section:
+                return
+            previous_section = record.current_section
+            if previous_section is not None:
+                self._discard(record.track_id, previous_section)
+                print(f"Object {record.track_id} left section {previous_section}")
+        else:
+            # New object entering from outside the frame
+            record.counted = True
+            previous_section = None
+
+        record.previous_section = previous_section
+        record.current_section = section
+        if section is not None:
+            self.members[section].add(record.track_id)
+            self.sections[section]['objects'] = len(self.members[section])
+            print(f"Object {record.track_id} entered section {section}")
+
+    def release(self, record):
+        """Stop counting a track, e.g. when it expires; its other state is kept"""
+        if record.counted and record.current_section is not None:
+            self._discard(record.track_id, record.current_section)
+        self._uncount(record)
+
+    def clear_section(self, section_id):
+        for track_id in self.members[section_id]:
+            record = self.tracks.peek(track_id)
+            if record is not None:
+                self._uncount(record)
+        self.members[section_id].clear()
+        self.sections[section_id]['objects'] = 0
+
+    def count_stickers(self, left_stickers, right_stickers):
+        """Stickers are detected afresh every frame, so their counts are simply replaced"""
+        stickers = np.concatenate([left_stickers[:, :4], right_stickers[:, :4]])
+        counts = self.layout.counts((stickers[:, :2] + stickers[:, 2:]) / 2)
+        for section_id, count in enumerate(counts.tolist()):
+            self.sections[section_id]['stickers'] = count
+
+    def reset(self):
+        for section_id in range(self.section_count):
+            self.clear_section(section_id)
+            self.sections[section_id]['stickers'] = 0
+            self.empty_streaks[section_id] = 0
+
+    def _discard(self, track_id, section):
+        self.members[section].discard(track_id)
+        self.sections[section]['objects'] = len(self.members[section])
+
+    @staticmethod
+    def _uncount(record):
+        record.counted = False
+        record.current_section = None
+        record.previous_section = None
@@ -1,14 +1,32 @@
+import os
 import cv2
 import time
+import numpy as np
 from PIL import Image, ImageTk
 import tkinter as tk
-from comparer_module import Comparer
-from sticker_module import detect_stickers  # Returns only left stickers now
+from comparer_module import Comparer, SECTIONS
+from capture_module import CameraCapture
+from detections_module import FrameDetections
+from pipeline_module import FramePipeline
+from model_registry import registry
+from motion_module import MotionGate
+from section_module import SectionOccupancy
+from zone_module import ZoneLayout
+from tracker_module import IoUTracker
+from inference_server import InferenceServer
+from sticker_module import detect_stickers, suppress_duplicates, stickers_in_box, containment_matrix, StickerVerdictCache
+
+# Part tracker: "ultralytics" (model.track) or "iou" (built-in NumPy tracker fed by model.predict)
+PART_TRACKER = os.getenv('PART_TRACKER', 'ultralytics')
+# With the built-in tracker, run part detection on every n-th frame and extrapolate the tracks in between
+DETECT_INTERVAL = int(os.getenv('DETECT_INTERVAL', '1'))
 
 class SessionOperator:
-    def __init__(self, tkinter_frame, end_session_callback, model_path, right_base_image_path, left_base_image_path, user_info=None, access_token=None):
-        self.tkinter_frame = tkinter_frame
-        self.tkinter_frame.winfo_toplevel().geometry("1000x800")
+    def __init__(self, tkinter_frame, end_session_callback, model_path, right_base_image_path, left_base_image_path, user_info=None, access_token=None, use_pipeline=True, frame_source=None, use_inference_server=False,
+                 part_tracker=PART_TRACKER, detect_interval=DETECT_INTERVAL):
+        self.tkinter_frame = tkinter_frame  # None when running headless (see batch_evaluator)
+        if self.tkinter_frame is not None:
+            self.tkinter_frame.winfo_toplevel().geometry("1000x800")
         self.end_session_callback = end_session_callback
         self.model_path = model_path
         self.right_base_image_path = right_base_image_path
@@ -17,27 +35,62 @@ class SessionOperator:
         self.access_token = access_token
         
         # Initialize comparer with user information
-        self.comparer = Comparer(camera_id=2, model_path=self.model_path, user_info=user_info)
+        self.comparer = Comparer(camera_id=2, model_path=self.model_path, user_info=user_info,
+                                 frame_source=frame_source, load_model=not use_inference_server)
         self.comparer.load_base_images()
+
+        # Optionally run the models in a separate process so inference spikes never hold the GIL
+        self.inference_server = None
+        self.inference_client = None
+        if use_inference_server:
+            self.inference_server = InferenceServer(self.model_path, self.comparer.frame.shape)
+            self.inference_client = self.inference_server.start()
         self.is_running = True
+
+        # Built-in tracker replacing model.track, optionally with detection on every detect_interval-th frame
+        if part_tracker not in ('ultralytics', 'iou'):
+            raise ValueError(f"Unknown part tracker: {part_tracker}")
+        self.part_tracker = IoUTracker() if part_tracker == 'iou' else None
+        self.detect_interval = max(1, detect_interval)
+        self._tracker_frame_index = 0
+
+        # Camera reads run on their own thread; the loop always takes the newest frame
+        self.capture = CameraCapture(self.comparer.cap)
+
+        # Overlap detection, sticker, compare and render work of consecutive frames
+        self.use_pipeline = use_pipeline
+        self.pipeline = None
         
-        # Grid system for 3 vertical sections
-        self.vertical_sections = {0: {'objects': 0, 'stickers': 0}, 
-                                  1: {'objects': 0, 'stickers': 0}, 
-                                  2: {'objects': 0, 'stickers': 0}}
         self.frame_width = None
         self.frame_height = None
         
-        # Tracking system for persistent counting
-        self.tracked_objects = {}  # {track_id: {'current_section': section_id, 'previous_section': section_id}}
-        self.tracked_stickers = {}  # {sticker_id: {'current_section': section_id, 'previous_section': section_id}}
-        self.sticker_id_counter = 0
-        self.cleanup_disabled = False  # Cleanup is always enabled
+        # Tracking system for persistent counting: one record per track id, shared with the comparer
+        # and dropped once a track has not been seen for its TTL
+        self.tracks = self.comparer.tracks
+
+        # Grid system for the vertical sections (3 lanes unless ZONE_LAYOUT says otherwise):
+        # per-section members and empty streaks, updated once per frame
+        self.section_layout = ZoneLayout.lanes(SECTIONS, self.comparer.width, self.comparer.height)
+        self.occupancy = SectionOccupancy(self.tracks, self.section_layout)
+        self.vertical_sections = self.occupancy.sections
+        # An expired track no longer counts in its section
+        self.tracks.on_evict = self.occupancy.release
         
-        # Persistent error tracking - requires 10 consecutive frames before showing error
-        self.sticker_error_tracking = {}  # {track_id: {'error_type': str, 'consecutive_frames': int}}
+        # Persistent error tracking (error_type/error_frames of each track) - requires 10 consecutive frames before showing error
         self.required_error_frames = 10  # Number of consecutive frames needed for error
         
+        # Stickers only count inside part boxes, so only search crops around them
+        self.sticker_roi_mode = True
+        # Confirmed per-track sticker verdicts, re-verified periodically
+        self.sticker_cache = StickerVerdictCache()
+        self._sticker_frame_index = 0
+
+        # Skip or throttle inference while nothing moves on the belt
+        self.motion_gate = MotionGate()
+        self._last_detections = None
+        self._last_features = None
+        self._last_stickers = None
+
         # Pile visualization toggle
         self.show_pile_visualization = True  # Flag to show/hide pile visualization
    
@@ -120,11 +173,17 @@ class SessionOperator:
         self.tkinter_frame.bind_all('<KeyPress-h>', self._on_h_key_pressed)
         self.tkinter_frame.focus_set()  # Make sure the frame can receive focus
 
+        self.capture.start(first_frame=self.comparer.frame)
+        if self.use_pipeline:
+            self.pipeline = FramePipeline(self.capture, self._pipeline_stages())
+            self.pipeline.start()
         self._update_frame()
 
     def _stop_updates(self):
         """Pause frame updates without ending the session."""
         self.is_running = False
+        if self.pipeline is not None:
+            self.pipeline.pause()
         self.stop_button.pack_forget()
         self.continue_button.pack(side="left", padx=10)
 
@@ -140,6 +199,9 @@ class SessionOperator:
         # Ensure pause text is hidden
         self.pause_overlay.pack_forget()
 
+        if self.pipeline is not None:
+            self.pipeline.resume()
+
         self._update_frame()
     
     def _blink_pause_overlay(self):
@@ -154,230 +216,12 @@ class SessionOperator:
             self.tkinter_frame.after(500, self._blink_pause_overlay)
 
     def _initialize_vertical_sections(self, frame_width, frame_height):
-        """Initialize the 3 vertical sections"""
+        """Initialize the vertical sections"""
         self.frame_width = frame_width
         self.frame_height = frame_height
     
-    def _get_vertical_section(self, x, y):
-        """Determine which vertical section a point (x, y) belongs to (0, 1, or 2)"""
-        if self.frame_width is None:
-            return None
-        
-        section_width = self.frame_width // 3
-        section = min(int(x // section_width), 2)  # Ensure section is 0, 1, or 2
-        return section
-    
-    def _track_object_movement(self, track_id, current_section):
-        """Track object movement between sections and update counts accordingly"""
-        if track_id not in self.tracked_objects:
-            # New object entering from outside the frame
-            self.tracked_objects[track_id] = {
-                'current_section': current_section,
-                'previous_section': None,
-                'ever_tracked': True,  # Mark that this object has been seen
-                'last_seen_frame': time.time()
-            }
-            if current_section is not None:
-                self.vertical_sections[current_section]['objects'] += 1
-                print(f"Object {track_id} entered section {current_section}")
-        else:
-            # Existing object - update last seen time
-            self.tracked_objects[track_id]['last_seen_frame'] = time.time()
-            previous_section = self.tracked_objects[track_id]['current_section']
-            
-            if previous_section != current_section:
-                # Object moved to a different section (crossing boundary)
-                if previous_section is not None:
-                    # Decrement count from previous section
-                    self.vertical_sections[previous_section]['objects'] -= 1
-                    print(f"Object {track_id} left section {previous_section}")
-                
-                if current_section is not None:
-                    # Increment count in new section
-                    self.vertical_sections[current_section]['objects'] += 1
-                    print(f"Object {track_id} entered section {current_section}")
-                
-                # Update tracking info
-                self.tracked_objects[track_id]['previous_section'] = previous_section
-                self.tracked_objects[track_id]['current_section'] = current_section
-    
-    def _track_sticker_movement(self, sticker_center, sticker_bbox):
-        """Track sticker movement between sections and update counts accordingly"""
-        current_section = self._get_vertical_section(sticker_center[0], sticker_center[1])
-        
-        # Find if this sticker matches any existing tracked sticker (by proximity)
-        sticker_id = None
-        min_distance = float('inf')
-        threshold_distance = 50  # pixels
-        
-        for sid, sinfo in self.tracked_stickers.items():
-            if 'last_position' in sinfo:
-                last_pos = sinfo['last_position']
-                distance = ((sticker_center[0] - last_pos[0])**2 + (sticker_center[1] - last_pos[1])**2)**0.5
-                if distance < threshold_distance and distance < min_distance:
-                    min_distance = distance
-                    sticker_id = sid
-        
-        if sticker_id is None:
-            # New sticker entering
-            sticker_id = self.sticker_id_counter
-            self.sticker_id_counter += 1
-            self.tracked_stickers[sticker_id] = {
-                'current_section': current_section,
-                'previous_section': None,
-                'last_position': sticker_center,
-                'last_seen_frame': time.time()
-            }
-            if current_section is not None:
-                self.vertical_sections[current_section]['stickers'] += 1
-                print(f"Sticker {sticker_id} entered section {current_section}")
-        else:
-            # Existing sticker - update last seen time and position
-            self.tracked_stickers[sticker_id]['last_seen_frame'] = time.time()
-            previous_section = self.tracked_stickers[sticker_id]['current_section']
-            
-            if previous_section != current_section:
-                # Sticker moved to a different section (crossing boundary)
-                if previous_section is not None:
-                    # Decrement count from previous section
-                    self.vertical_sections[previous_section]['stickers'] -= 1
-                    print(f"Sticker {sticker_id} left section {previous_section}")
-                
-                if current_section is not None:
-                    # Increment count in new section
-                    self.vertical_sections[current_section]['stickers'] += 1
-                    print(f"Sticker {sticker_id} entered section {current_section}")
-                
-                # Update tracking info
-                self.tracked_stickers[sticker_id]['previous_section'] = previous_section
-                self.tracked_stickers[sticker_id]['current_section'] = current_section
-            
-            # Update last known position
-            self.tracked_stickers[sticker_id]['last_position'] = sticker_center
-    
-    def _cleanup_lost_objects(self, current_track_ids):
-        """Clean up sections only when no objects are detected in that section for multiple consecutive frames"""
-        # Count how many objects are currently detected in each section based on YOLO detections
-        current_objects_per_section = {0: 0, 1: 0, 2: 0}
-        
-        # Count objects that YOLO is currently tracking in each section
-        for track_id in current_track_ids:
-            if track_id in self.tracked_objects:
-                current_section = self.tracked_objects[track_id]['current_section']
-                if current_section is not None:
-                    current_objects_per_section[current_section] += 1
-        
-        # Also count objects in each section based on current YOLO detections (more reliable)
-        actual_objects_per_section = {0: 0, 1: 0, 2: 0}
-        if hasattr(self.comparer, 'yolo_detections') and len(self.comparer.yolo_detections) > 0:
-            for det in self.comparer.yolo_detections[0].boxes:
-                if det.conf.cpu().numpy()[0] >= 0.5:  # Only count confident detections
-                    x1, y1, x2, y2 = det.xyxy[0].cpu().numpy()
-                    center_x = (x1 + x2) / 2
-                    center_y = (y1 + y2) / 2
-                    section = self._get_vertical_section(center_x, center_y)
-                    if section is not None:
-                        actual_objects_per_section[section] += 1
-        
-        # Initialize section empty counters if not exists
-        if not hasattr(self, 'section_empty_counters'):
-            self.section_empty_counters = {0: 0, 1: 0, 2: 0}
-        
-        # For each section, check if it's been empty for multiple consecutive frames
-        for section_id in range(3):
-            # Section is considered empty if both tracking and actual detection show no objects
-            section_is_empty = (current_objects_per_section[section_id] == 0 and 
-                              actual_objects_per_section[section_id] == 0)
-            
-            if section_is_empty:
-                # No objects currently detected in this section
-                self.section_empty_counters[section_id] += 1
-                
-                # Only reset if section has been empty for 90+ consecutive frames (about 3 seconds at 30fps)
-                # This prevents false resets due to temporary tracking loss or occlusion
-                if self.section_empty_counters[section_id] >= 90:
-                    if self.vertical_sections[section_id]['objects'] > 0:
-                        print(f"Section {section_id} has been empty for {self.section_empty_counters[section_id]} frames, resetting count from {self.vertical_sections[section_id]['objects']} to 0")
-                        self.vertical_sections[section_id]['objects'] = 0
-                        
-                        # Remove tracking data for objects that were in this section
-                        objects_to_remove = []
-                        for track_id, obj_info in self.tracked_objects.items():
-                            if obj_info['current_section'] == section_id:
-                                objects_to_remove.append(track_id)
-                        
-                        for track_id in objects_to_remove:
-                            del self.tracked_objects[track_id]
-                            print(f"Removed tracking for object {track_id} from empty section {section_id}")
-                    
-                    # Reset the counter after cleanup
-                    self.section_empty_counters[section_id] = 0
-            else:
-                # Objects detected in this section, reset empty counter
-                self.section_empty_counters[section_id] = 0
-        
-        # Update last seen time for detected objects
-        current_time = time.time()
-        for track_id in current_track_ids:
-            if track_id in self.tracked_objects:
-                self.tracked_objects[track_id]['last_seen_frame'] = current_time
-    
-    def _cleanup_lost_stickers(self, current_sticker_positions):
-        """Only reset section sticker counts when no stickers are detected in that section for multiple consecutive frames"""
-        # Count how many stickers are currently detected in each section
-        current_stickers_per_section = {0: 0, 1: 0, 2: 0}
-        
-        for pos in current_sticker_positions:
-            section = self._get_vertical_section(pos[0], pos[1])
-            if section is not None:
-                current_stickers_per_section[section] += 1
-        
-        # Initialize sticker section empty counters if not exists
-        if not hasattr(self, 'sticker_section_empty_counters'):
-            self.sticker_section_empty_counters = {0: 0, 1: 0, 2: 0}
-        
-        # For each section, check if it's been empty for multiple consecutive frames
-        for section_id in range(3):
-            if current_stickers_per_section[section_id] == 0:
-                # No stickers currently detected in this section
-                self.sticker_section_empty_counters[section_id] += 1
-                
-                # Only reset if section has been empty for 90+ consecutive frames (about 3 seconds at 30fps)
-                if self.sticker_section_empty_counters[section_id] >= 90:
-                    if self.vertical_sections[section_id]['stickers'] > 0:
-                        print(f"Section {section_id} has been empty of stickers for {self.sticker_section_empty_counters[section_id]} frames, resetting count from {self.vertical_sections[section_id]['stickers']} to 0")
-                        self.vertical_sections[section_id]['stickers'] = 0
-                        
-                        # Remove tracking data for stickers that were in this section
-                        stickers_to_remove = []
-                        for sticker_id, sticker_info in self.tracked_stickers.items():
-                            if sticker_info['current_section'] == section_id:
-                                stickers_to_remove.append(sticker_id)
-                        
-                        for sticker_id in stickers_to_remove:
-                            del self.tracked_stickers[sticker_id]
-                            print(f"Removed tracking for sticker {sticker_id} from empty section {section_id}")
-                    
-                    # Reset the counter after cleanup
-                    self.sticker_section_empty_counters[section_id] = 0
-            else:
-                # Stickers detected in this section, reset empty counter
-                self.sticker_section_empty_counters[section_id] = 0
-        
-        # Update last seen time for detected stickers
-        current_time = time.time()
-        for sticker_id, sticker_info in self.tracked_stickers.items():
-            # Check if this sticker is still present in current frame
-            for pos in current_sticker_positions:
-                last_pos = sticker_info['last_position']
-                distance = ((pos[0] - last_pos[0])**2 + (pos[1] - last_pos[1])**2)**0.5
-                if distance < 50:  # threshold
-                    # Update last seen time for found stickers
-                    sticker_info['last_seen_frame'] = current_time
-                    break
-    
-    def _draw_vertical_grid_overlay(self, frame):
-        """Draw the 3 vertical sections with background colors and information"""
+    def _draw_vertical_grid_overlay(self, frame, sections=None):
+        """Draw the vertical sections with background colors and information"""
         if self.frame_width is None or self.frame_height is None:
             return frame
         
@@ -385,19 +229,17 @@ class SessionOperator:
         if not self.show_pile_visualization:
             return frame
         
-        section_width = self.frame_width // 3
-        
+        if sections is None:
+            sections = self.vertical_sections
+
         # Draw background colors and section information
-        for section_id in range(3):
-            section_info = self.vertical_sections[section_id]
+        for section_id, polygon in enumerate(self.section_layout.zones):
+            section_info = sections[section_id]
             objects_count = section_info['objects']
             stickers_count = section_info['stickers']
             
-            # Calculate section coordinates
-            x1 = section_id * section_width
-            x2 = x1 + section_width
-            y1 = 0
-            y2 = self.frame_height
+            # Text goes in the top-left corner of the section's bounding box
+            (x1, y1), _ = self.section_layout.bounds(section_id)
             
             # Check if counts match
             counts_match = objects_count == stickers_count
@@ -406,31 +248,27 @@ class SessionOperator:
             overlay = frame.copy()
             if counts_match:
                 # Green background for matching counts
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 255, 0), -1)
+                cv2.fillPoly(overlay, [polygon], (0, 255, 0))
             else:
                 # Yellow background for mismatched counts
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 255, 255), -1)
+                cv2.fillPoly(overlay, [polygon], (0, 255, 255))
             
             # Apply overlay with transparency
             cv2.addWeighted(frame, 0.8, overlay, 0.2, 0, frame)
             
             # Draw section borders
             border_color = (0, 255, 0) if counts_match else (0, 255, 255)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), border_color, 3)
-            
-            # Draw vertical dividing lines
-            if section_id < 2:  # Don't draw line after last section
-                cv2.line(frame, (x2, 0), (x2, self.frame_height), (255, 255, 255), 2)
+            cv2.polylines(frame, [polygon], True, border_color, 3)
             
             # Draw text information
             text_x = x1 + 10
-            text_y = 30
+            text_y = y1 + 30
             
             # Background rectangle for text readability
             text_bg_x1 = x1 + 5
-            text_bg_y1 = 5
+            text_bg_y1 = y1 + 5
             text_bg_x2 = x1 + 120
-            text_bg_y2 = 100
+            text_bg_y2 = y1 + 100
             cv2.rectangle(frame, (text_bg_x1, text_bg_y1), (text_bg_x2, text_bg_y2), (0, 0, 0), -1)
             cv2.rectangle(frame, (text_bg_x1, text_bg_y1), (text_bg_x2, text_bg_y2), (255, 255, 255), 1)
             
@@ -457,25 +295,14 @@ class SessionOperator:
 
     def reset_tracking_system(self):
         """Reset the entire tracking system"""
-        # Reset all section counters
-        for section_id in range(3):
-            self.vertical_sections[section_id]['objects'] = 0
-            self.vertical_sections[section_id]['stickers'] = 0
+        # Reset all section counters and stop counting every track (only objects need tracking now)
+        self.occupancy.reset()
         
-        # Clear tracking dictionaries (only objects need tracking now)
-        self.tracked_objects.clear()
+        # Clear sticker errors; placement verdicts stay with their tracks
+        for track in self.tracks.values():
+            track.clear_error()
         # Note: stickers are now counted directly each frame, no tracking needed
-        
-        # Clear sticker error tracking
-        self.sticker_error_tracking.clear()
-        
-        # Reset section empty counters
-        if hasattr(self, 'section_empty_counters'):
-            self.section_empty_counters = {0: 0, 1: 0, 2: 0}
-        if hasattr(self, 'sticker_section_empty_counters'):
-            self.sticker_section_empty_counters = {0: 0, 1: 0, 2: 0}
-        if hasattr(self, 'immediate_empty_counters'):
-            self.immediate_empty_counters = {0: 0, 1: 0, 2: 0}
+        self.sticker_cache.clear()
         
         # Reset cleanup counter
         self._cleanup_counter = 0
@@ -497,14 +324,162 @@ class SessionOperator:
         if not self.is_running:
             return
 
-        # Start timing frame processing
-        frame_start_time = time.time()
+        if self.pipeline is not None:
+            # Stages run on worker threads; the Tk thread only displays finished frames
+            packet = self.pipeline.latest_result()
+            if packet is None and not self.pipeline.is_alive():
+                self._stop_process()
+                return
+        else:
+            frame_packet = self.capture.latest()
+            if frame_packet is None:
+                if not self.capture.is_alive():
+                    self._stop_process()
+                    return
+                packet = None
+            else:
+                packet = self.process_frame(*frame_packet)
 
-        ret, self.comparer.frame = self.comparer.cap.read()
-        if not ret:
-            self._stop_process()
-            return
+        if packet is not None:
+            self._display_packet(packet)
+
+        self.tkinter_frame.after(2, self._update_frame)
 
+    def process_frame(self, frame, capture_time=None, media_time=None, render=True):
+        """
+        Run every processing stage on one frame serially and return the finished packet
+
+        Args:
+            frame: BGR frame
+            capture_time: wall-clock capture time, defaults to now
+            media_time: timestamp on a recording's own timeline, used instead of
+                wall-clock time for comparison timing when replaying faster than real time
+            render (bool): skip the display conversion stage when False (headless runs)
+        """
+        packet = {
+            'frame': frame,
+            'capture_time': capture_time if capture_time is not None else time.time(),
+            'processing_time': 0.0
+        }
+        if media_time is not None:
+            packet['media_time'] = media_time
+        for name, stage in self._pipeline_stages():
+            if name == 'render' and not render:
+                continue
+            stage_start = time.time()
+            packet = stage(packet)
+            packet['processing_time'] += time.time() - stage_start
+        return packet
+
+    def _pipeline_stages(self):
+        """Ordered (name, func) processing stages shared by the serial and pipelined loops"""
+        return [
+            ('detect', self._stage_detect),
+            ('stickers', self._stage_stickers),
+            ('compare', self._stage_compare),
+            ('render', self._stage_render)
+        ]
+
+    def _stage_detect(self, packet):
+        """Run part detection and tracking, throttled while the belt is static"""
+        run_inference = self.motion_gate.update(packet['frame']) or self._last_detections is None
+        if run_inference:
+            packet['detections'] = self._track_parts(packet)
+            # Taken right after tracking so a pipelined frame never sees the next frame's features
+            packet['features'] = self.comparer.take_features()
+            self._last_detections = packet['detections']
+            self._last_features = packet['features']
+        else:
+            # Nothing moved, so the previous detections still describe the scene
+            packet['detections'] = self._last_detections
+            packet['features'] = self._last_features
+        packet['inference_skipped'] = not run_inference
+        packet['idle'] = self.motion_gate.is_idle
+        packet['detect_time'] = packet.get('media_time', time.time())
+        return packet
+
+    def _track_parts(self, packet):
+        """Track parts in-process, or on the inference server when one is running"""
+        if self.part_tracker is not None:
+            return self._track_parts_builtin(packet)
+        if self.inference_client is None:
+            results = self.comparer.model.track(packet['frame'], verbose=False, persist=True)
+            return FrameDetections.from_results(results, self.section_layout, self.comparer.test_zones)
+
+        packet['inference_token'], data = self.inference_client.track(packet['frame'])
+        return FrameDetections.from_boxes_data(data, self.section_layout, self.comparer.test_zones)
+
+    def _track_parts_builtin(self, packet):
+        """Detect parts on every detect_interval-th frame and track them with the built-in tracker"""
+        run_detection = self._tracker_frame_index % self.detect_interval == 0
+        self._tracker_frame_index += 1
+        if not run_detection:
+            if self.inference_client is not None:
+                # Sticker requests still need this frame on the server
+                packet['inference_token'] = self.inference_client.upload(packet['frame'])
+            data = self.part_tracker.predict()
+        elif self.inference_client is None:
+            results = self.comparer.model.predict(packet['frame'], verbose=False)
+            data = self.part_tracker.update(results[0].boxes.data.cpu().numpy())
+        else:
+            packet['inference_token'], data = self.inference_client.predict(packet['frame'])
+            data = self.part_tracker.update(data)
+        return FrameDetections.from_boxes_data(data, self.section_layout, self.comparer.test_zones)
+
+    def _detect_stickers(self, packet, part_boxes=None):
+        """Detect stickers in-process, or on the inference server for the frame it already holds"""
+        if self.inference_client is None:
+            return detect_stickers(packet['frame'], conf_threshold=0.7, part_boxes=part_boxes)
+        return self.inference_client.detect_stickers(packet['inference_token'], part_boxes, conf_threshold=0.7)
+
+    def _stage_stickers(self, packet):
+        """Detect left and right stickers, skipping parts whose verdict is cached"""
+        if packet['inference_skipped'] and self._last_stickers is not None:
+            packet['left_stickers'], packet['right_stickers'] = self._last_stickers
+            return packet
+
+        self._sticker_frame_index += 1
+        part_boxes = packet['detections'].xyxy
+        part_ids = packet['detections'].ids
+
+        # Untracked parts (id 0) cannot be cached and are always detected
+        needs_detection = np.array([
+            track_id == 0 or self.sticker_cache.needs_detection(track_id, box, self._sticker_frame_index)
+            for track_id, box in zip(part_ids, part_boxes)
+        ], dtype=bool)
+
+        left_parts, right_parts = [], []
+        if needs_detection.any() or (not self.sticker_roi_mode and len(part_boxes) == 0):
+            if self.sticker_roi_mode:
+                left, right = self._detect_stickers(packet, part_boxes[needs_detection])
+            else:
+                # A full-frame pass verifies every part at once
+                left, right = self._detect_stickers(packet)
+                needs_detection[:] = True
+            left_parts.append(left)
+            right_parts.append(right)
+            for track_id, box in zip(part_ids[needs_detection], part_boxes[needs_detection]):
+                if track_id != 0:
+                    self.sticker_cache.update(track_id, box, left[stickers_in_box(left, box)],
+                                              right[stickers_in_box(right, box)], self._sticker_frame_index)
+
+        for track_id, box in zip(part_ids[~needs_detection], part_boxes[~needs_detection]):
+            left, right = self.sticker_cache.cached_stickers(track_id, box)
+            left_parts.append(left)
+            right_parts.append(right)
+
+        self.sticker_cache.retain(set(part_ids.tolist()))
+        left = np.concatenate(left_parts) if left_parts else np.zeros((0, 5), dtype=np.float32)
+        right = np.concatenate(right_parts) if right_parts else np.zeros((0, 5), dtype=np.float32)
+        packet['left_stickers'] = suppress_duplicates(left)
+        packet['right_stickers'] = suppress_duplicates(right)
+        self._last_stickers = (packet['left_stickers'], packet['right_stickers'])
+        return packet
+
+    def _stage_compare(self, packet):
+        """Update tracking, comparison and section state, and draw detections"""
+        self.comparer.frame = packet['frame']
+        self.comparer.frame_features = packet['features']
         self.comparer.frame_display = self.comparer.frame.copy()
         
         # Initialize vertical sections if not done yet
@@ -513,115 +488,73 @@ class SessionOperator:
         
         self.comparer.print_boxes()
 
-        self.comparer.yolo_detections = self.comparer.model.track(self.comparer.frame, verbose=False, persist=True)
-        current_time = time.time()
+        self.comparer.yolo_detections = packet['detections']
+        current_time = packet['detect_time']
 
-        self.comparer.is_right_box_empty, self.comparer.is_left_box_empty = self.comparer.check_if_box_is_empty(
-            self.comparer.yolo_detections[0].boxes.data
-        )
+        parts = packet['detections']
+        self.comparer.is_right_box_empty, self.comparer.is_left_box_empty = self.comparer.check_if_box_is_empty(parts)
 
         right_status = "Empty" if self.comparer.is_right_box_empty else "Occupied"
         left_status = "Empty" if self.comparer.is_left_box_empty else "Occupied"
-        self.status_label.config(text=f"Right Box: {right_status} | Left Box: {left_status}")
-
-        # Detect both left and right stickers per frame
-        all_left_stickers, all_right_stickers = detect_stickers(self.comparer.frame, conf_threshold=0.7)
-
-        # Track current sticker positions for cleanup
-        current_sticker_positions = []
-        for box in all_left_stickers:
-            sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-            center_x = (sx1 + sx2) / 2
-            center_y = (sy1 + sy2) / 2
-            current_sticker_positions.append((center_x, center_y))
-        
-        for box in all_right_stickers:
-            sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-            center_x = (sx1 + sx2) / 2
-            center_y = (sy1 + sy2) / 2
-            current_sticker_positions.append((center_x, center_y))
+        packet['status_text'] = f"Right Box: {right_status} | Left Box: {left_status}"
+        if packet['idle']:
+            packet['status_text'] += " | Conveyor idle"
+
+        all_left_stickers = packet['left_stickers']
+        all_right_stickers = packet['right_stickers']
 
         # Track current object track IDs for cleanup
         current_track_ids = set()
+        # Placement tests requested by compare, run for all boxes together after the loop
+        pending_tests = {}
 
-        for det in self.comparer.yolo_detections[0].boxes:
-            track_id = det.id.int().cpu().numpy()[0] if det.id is not None else 0
-            x1, y1, x2, y2 = det.xyxy[0].cpu().numpy()
-            conf = det.conf.cpu().numpy()[0]
-            cls = det.cls.cpu().numpy()[0]
+        # Move tracks between sections and reset sections left without detections, in one pass
+        self.occupancy.update(parts)
 
-            if conf < 0.5:
-                continue
+        # Assign every sticker to the parts containing its centre in one pass
+        left_in_part = containment_matrix(parts.xyxy, all_left_stickers)
+        right_in_part = containment_matrix(parts.xyxy, all_right_stickers)
 
+        # Low-confidence parts were already dropped when the detections were built
+        for part_index, ((x1, y1, x2, y2), cls, track_id, test_zone) in enumerate(zip(
+                parts.xyxy.tolist(), parts.cls.tolist(), parts.ids.tolist(), parts.test_zones.tolist())):
             # Add to current track IDs
             current_track_ids.add(track_id)
+            self.tracks.touch(track_id, current_time)
 
-            # Track object movement in vertical sections
-            center_x = (x1 + x2) / 2
-            center_y = (y1 + y2) / 2
-            current_section = self._get_vertical_section(center_x, center_y)
-            self._track_object_movement(track_id, current_section)
-
-            part_side = self.comparer.index_side_info[track_id]  # 1 = right, 2 = left
+            part_side = self.tracks.get(track_id).side  # 1 = right, 2 = left
 
-            self.comparer.compare(x1, y1, x2, y2, cls, track_id, current_time)
+            self.comparer.compare(x1, y1, x2, y2, cls, track_id, current_time, pending_tests, test_zone)
             self.comparer.check(x1, x2, track_id)
 
-            # Check for left stickers inside this part
-            for box in all_left_stickers:
-                sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-                cx, cy = (sx1 + sx2) / 2, (sy1 + sy2) / 2
-                if x1 <= cx <= x2 and y1 <= cy <= y2:
-                    if part_side == 1:  # wrong: left sticker on right-labeled part
-                        color = (0, 0, 255)  # Red
-                        self._track_sticker_error(track_id, "left_on_right")
-                    else:  # correct
-                        color = (0, 255, 0)  # Green
-                        # Reset error tracking if sticker is now correct
-                        if track_id in self.sticker_error_tracking:
-                            del self.sticker_error_tracking[track_id]
-                    cv2.rectangle(self.comparer.frame_display, (int(sx1), int(sy1)), (int(sx2), int(sy2)), color, 2)
-                    cv2.putText(self.comparer.frame_display, "L", (int(sx1), int(sy1) - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
-
-            # Check for right stickers inside this part
-            for box in all_right_stickers:
-                sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-                cx, cy = (sx1 + sx2) / 2, (sy1 + sy2) / 2
-                if x1 <= cx <= x2 and y1 <= cy <= y2:
-                    if part_side == 2:  # wrong: right sticker on left-labeled part
-                        color = (0, 0, 255)  # Red
-                        self._track_sticker_error(track_id, "right_on_left")
-                    else:  # correct
-                        color = (0, 255, 0)  # Green
-                        # Reset error tracking if sticker is now correct
-                        if track_id in self.sticker_error_tracking:
-                            del self.sticker_error_tracking[track_id]
-                    cv2.rectangle(self.comparer.frame_display, (int(sx1), int(sy1)), (int(sx2), int(sy2)), color, 2)
-                    cv2.putText(self.comparer.frame_display, "R", (int(sx1), int(sy1) - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+            # Stickers assigned to this part by the containment matrices
+            self._check_part_stickers(track_id, part_side, all_left_stickers[left_in_part[part_index]],
+                                      "L", wrong_side=1, error_type="left_on_right")
+            self._check_part_stickers(track_id, part_side, all_right_stickers[right_in_part[part_index]],
+                                      "R", wrong_side=2, error_type="right_on_left")
 
             # Draw part bounding box
             cv2.rectangle(self.comparer.frame_display, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
             cv2.putText(self.comparer.frame_display, str(part_side),
                         (int(x1), int(y1) - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
 
-        # Clean up objects that are no longer tracked (run more frequently for better responsiveness)
+        self.comparer.run_pending_tests(pending_tests)
+
+        # Clean up sticker errors of parts that are no longer tracked
         if hasattr(self, '_cleanup_counter'):
             self._cleanup_counter += 1
         else:
             self._cleanup_counter = 0
             
-        # Run cleanup every 30 frames (about once per second at 30fps) for better responsiveness
-        if not self.cleanup_disabled and self._cleanup_counter % 30 == 0:
-            self._cleanup_lost_objects(current_track_ids)
+        # Run cleanup every 30 frames (about once per second at 30fps)
+        if self._cleanup_counter % 30 == 0:
             self._cleanup_sticker_errors(current_track_ids)
             
-        # Also run immediate check for completely empty sections every frame
-        self._check_empty_sections_immediate()
+        # Forget tracks that have been gone longer than the store's TTL
+        self.tracks.evict_expired(current_time)
 
         # Count stickers directly in each vertical section - simple and reliable approach
-        self._count_stickers_in_sections(all_left_stickers, all_right_stickers)
+        self.occupancy.count_stickers(all_left_stickers, all_right_stickers)
         
         # Clean up stickers no longer needed since we count directly each frame
 
@@ -637,138 +570,91 @@ class SessionOperator:
                                 (self.comparer.frame_display.shape[1] // 2 - 250, 60),
                                 cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3, cv2.LINE_AA)
 
-        # Draw vertical grid overlay with section information and background colors
-        self.comparer.frame_display = self._draw_vertical_grid_overlay(self.comparer.frame_display)
-
-        # Show frame on GUI
-        img_rgb = cv2.cvtColor(self.comparer.frame_display, cv2.COLOR_BGR2RGB)
-        img_pil = Image.fromarray(img_rgb)
-        img_tk = ImageTk.PhotoImage(image=img_pil)
+        packet['display'] = self.comparer.frame_display
+        # Snapshot counts so rendering never races the next frame's updates
+        packet['sections'] = {section_id: dict(info) for section_id, info in self.vertical_sections.items()}
+        return packet
+
+    def _check_part_stickers(self, track_id, part_side, stickers, label, wrong_side, error_type):
+        """Track sticker errors for the stickers on one part and draw them"""
+        for sx1, sy1, sx2, sy2 in stickers[:, :4].astype(int).tolist():
+            if part_side == wrong_side:  # wrong: sticker of the other side on this part
+                color = (0, 0, 255)  # Red
+                self._track_sticker_error(track_id, error_type)
+            else:  # correct
+                color = (0, 255, 0)  # Green
+                # Reset error tracking if sticker is now correct
+                self.tracks.get(track_id).clear_error()
+            cv2.rectangle(self.comparer.frame_display, (sx1, sy1), (sx2, sy2), color, 2)
+            cv2.putText(self.comparer.frame_display, label, (sx1, sy1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+
+    def _stage_render(self, packet):
+        """Draw the grid overlay and convert the frame for display"""
+        display = self._draw_vertical_grid_overlay(packet['display'], packet['sections'])
+        img_rgb = cv2.cvtColor(display, cv2.COLOR_BGR2RGB)
+        packet['image'] = Image.fromarray(img_rgb)
+        return packet
+
+    def _display_packet(self, packet):
+        """Show a finished packet on the GUI; must run on the Tk thread"""
+        img_tk = ImageTk.PhotoImage(image=packet['image'])
         self.video_label.imgtk = img_tk
         self.video_label.configure(image=img_tk)
+        self.status_label.config(text=packet['status_text'])
 
-        # Calculate and log frame processing time
-        frame_processing_time = time.time() - frame_start_time
-        self.comparer.logger.add_processing_time(frame_processing_time)
-
-        self.tkinter_frame.after(2, self._update_frame)
+        # Log the frame's processing time summed over all stages
+        self.comparer.logger.add_processing_time(packet['processing_time'])
 
     def _stop_process(self):
         self.is_running = False
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.capture.stop()
+        if self.inference_server is not None:
+            self.inference_server.stop()
         self.comparer.logger.save_session(access_token=self.access_token)
         self.comparer.cap.release()
+        self.comparer.close()
+        print(f"Sticker verdict cache: {self.sticker_cache.stats()}")
+        print(f"Motion gate: {self.motion_gate.stats()}")
+        print(f"Track state: {self.tracks.stats()}")
+        if self.part_tracker is not None:
+            print(f"Part tracker: {self.part_tracker.stats()}")
+        # Models stay warm in the registry for the next session
+        print(f"Model registry: {registry.stats()}")
         if self.end_session_callback:
             self.end_session_callback()
 
     def _track_sticker_error(self, track_id, error_type):
         """Track sticker errors that need to persist for multiple frames before showing warning"""
-        if track_id not in self.sticker_error_tracking:
+        track = self.tracks.get(track_id)
+        if track.error_type is None:
             # First time seeing this error
-            self.sticker_error_tracking[track_id] = {
-                'error_type': error_type,
-                'consecutive_frames': 1
-            }
-        else:
-            existing_error = self.sticker_error_tracking[track_id]
-            if existing_error['error_type'] == error_type:
-                # Same error continues
-                existing_error['consecutive_frames'] += 1
+            track.error_type = error_type
+            track.error_frames = 1
+        elif track.error_type == error_type:
+            # Same error continues
+            track.error_frames += 1
+            
+            # If we've reached the threshold, trigger the warning
+            if track.error_frames >= self.required_error_frames:
+                self.comparer.sticker_warning_timestamp = time.time()
+                self.comparer.sticker_error_type = error_type
+                print(f"Sticker error confirmed after {track.error_frames} frames: {error_type}")
                 
-                # If we've reached the threshold, trigger the warning
-                if existing_error['consecutive_frames'] >= self.required_error_frames:
-                    self.comparer.sticker_warning_timestamp = time.time()
-                    self.comparer.sticker_error_type = error_type
-                    print(f"Sticker error confirmed after {existing_error['consecutive_frames']} frames: {error_type}")
-                    
-                    # Log the sticker error/warning to database
-                    if "left" in error_type.lower():
-                        self.comparer.logger.log_sticker_error(is_right_side=False)
-                    elif "right" in error_type.lower():
-                        self.comparer.logger.log_sticker_error(is_right_side=True)
-                    
-            else:
-                # Different error type, reset counter
-                existing_error['error_type'] = error_type
-                existing_error['consecutive_frames'] = 1
+                # Log the sticker error/warning to database
+                if "left" in error_type.lower():
+                    self.comparer.logger.log_sticker_error(is_right_side=False)
+                elif "right" in error_type.lower():
+                    self.comparer.logger.log_sticker_error(is_right_side=True)
+        else:
+            # Different error type, reset counter
+            track.error_type = error_type
+            track.error_frames = 1
     
     def _cleanup_sticker_errors(self, current_track_ids):
         """Remove error tracking for objects that are no longer being tracked"""
-        errors_to_remove = []
-        for track_id in self.sticker_error_tracking.keys():
-            if track_id not in current_track_ids:
-                errors_to_remove.append(track_id)
-        
-        for track_id in errors_to_remove:
-            del self.sticker_error_tracking[track_id]
-    
-    def _check_empty_sections_immediate(self):
-        """Immediate check for sections with no detections at all - runs every frame"""
-        if not hasattr(self.comparer, 'yolo_detections') or len(self.comparer.yolo_detections) == 0:
-            return
-            
-        # Count actual detections in each section from current frame
-        detections_per_section = {0: 0, 1: 0, 2: 0}
-        
-        for det in self.comparer.yolo_detections[0].boxes:
-            if det.conf.cpu().numpy()[0] >= 0.5:  # Only count confident detections
-                x1, y1, x2, y2 = det.xyxy[0].cpu().numpy()
-                center_x = (x1 + x2) / 2
-                center_y = (y1 + y2) / 2
-                section = self._get_vertical_section(center_x, center_y)
-                if section is not None:
-                    detections_per_section[section] += 1
-        
-        # Initialize immediate empty counters if not exists
-        if not hasattr(self, 'immediate_empty_counters'):
-            self.immediate_empty_counters = {0: 0, 1: 0, 2: 0}
-        
-        # Check each section for immediate emptiness
-        for section_id in range(3):
-            if detections_per_section[section_id] == 0:
-                # No detections in this section
-                self.immediate_empty_counters[section_id] += 1
-                
-                # Reset after 60 consecutive frames (2 seconds) of no detections
-                if self.immediate_empty_counters[section_id] >= 30:
-                    if self.vertical_sections[section_id]['objects'] > 0:
-                        print(f"IMMEDIATE: Section {section_id} has no detections for {self.immediate_empty_counters[section_id]} frames, resetting object count to 0")
-                        self.vertical_sections[section_id]['objects'] = 0
-                        
-                        # Remove all tracking data for this section
-                        objects_to_remove = []
-                        for track_id, obj_info in self.tracked_objects.items():
-                            if obj_info['current_section'] == section_id:
-                                objects_to_remove.append(track_id)
-                        
-                        for track_id in objects_to_remove:
-                            del self.tracked_objects[track_id]
-                    
-                    # Reset counter
-                    self.immediate_empty_counters[section_id] = 0
-            else:
-                # Detections found, reset counter
-                self.immediate_empty_counters[section_id] = 0
-
-    def _count_stickers_in_sections(self, all_left_stickers, all_right_stickers):
-        """Count stickers directly in each vertical section - simple and reliable"""
-        # Reset sticker counts to 0 for fresh counting each frame
-        for section_id in range(3):
-            self.vertical_sections[section_id]['stickers'] = 0
-        
-        # Count left stickers in each section
-        for box in all_left_stickers:
-            sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-            center_x = (sx1 + sx2) / 2
-            center_y = (sy1 + sy2) / 2
-            section = self._get_vertical_section(center_x, center_y)
-            if section is not None:
-                self.vertical_sections[section]['stickers'] += 1
-        
-        # Count right stickers in each section
-        for box in all_right_stickers:
-            sx1, sy1, sx2, sy2 = box.xyxy[0].tolist()
-            center_x = (sx1 + sx2) / 2
-            center_y = (sy1 + sy2) / 2
-            section = self._get_vertical_section(center_x, center_y)
-            if section is not None:
-                self.vertical_sections[section]['stickers'] += 1
+        for track in self.tracks.values():
+            if track.error_type is not None and track.track_id not in current_track_ids:
+                track.clear_error()
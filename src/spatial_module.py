@@ -0,0 +1,71 @@
+import numpy as np
+
+
+def iou_matrix(boxes1, boxes2):
+    """(N, M) IoU of every box in boxes1 against every box in boxes2; x1, y1, x2, y2 are the first four columns"""
+    a = boxes1[:, None, :4]
+    b = boxes2[None, :, :4]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter_area = inter_w * inter_h
+    area1 = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area2 = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union_area = area1 + area2 - inter_area
+    return np.divide(inter_area, union_area, out=np.zeros_like(inter_area, dtype=np.float32), where=union_area > 0)
+
+
+def iou(box1, box2):
+    x1 = max(box1[0], box2[0])
+    y1 = max(box1[1], box2[1])
+    x2 = min(box1[2], box2[2])
+    y2 = min(box1[3], box2[3])
+    inter_area = max(0, x2 - x1) * max(0, y2 - y1)
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    union_area = area1 + area2 - inter_area
+    return inter_area / union_area if union_area > 0 else 0
+
+
+def match_sticker_conflicts(left_stickers, right_stickers, iou_threshold=0.5):
+    """
+    Pair up left and right stickers detected on top of each other
+
+    Left stickers are visited in order and each takes its highest-IoU right
+    sticker not taken yet, as the pairwise scan did; only left stickers with
+    an overlap above the threshold are visited at all. The less confident
+    sticker of each pair is dropped.
+
+    Returns:
+        tuple: (left_keep, right_keep) index arrays of the stickers that survive
+    """
+    keep_left = np.ones(len(left_stickers), dtype=bool)
+    keep_right = np.ones(len(right_stickers), dtype=bool)
+    if len(left_stickers) == 0 or len(right_stickers) == 0:
+        return np.flatnonzero(keep_left), np.flatnonzero(keep_right)
+
+    ious = iou_matrix(left_stickers, right_stickers)
+    available = np.ones(len(right_stickers), dtype=bool)
+    for i in np.flatnonzero((ious > iou_threshold).any(axis=1)).tolist():
+        overlaps = np.where(available, ious[i], 0)
+        j = int(np.argmax(overlaps))
+        if overlaps[j] <= iou_threshold:
+            continue
+        available[j] = False
+        if left_stickers[i, 4] > right_stickers[j, 4]:
+            keep_right[j] = False
+        else:
+            keep_left[i] = False
+    return np.flatnonzero(keep_left), np.flatnonzero(keep_right)
+
+def resolve_sticker_conflicts(left_stickers, right_stickers, iou_threshold=0.5):
+    """
+    Resolve places where a left and a right sticker were detected on top of each other
+
+    Args:
+        left_stickers, right_stickers: (N, 5) arrays of x1, y1, x2, y2, conf
+
+    Returns:
+        tuple: (left, right) arrays keeping only the more confident sticker of each overlapping pair
+    """
+    left_keep, right_keep = match_sticker_conflicts(left_stickers, right_stickers, iou_threshold)
+    return left_stickers[left_keep], right_stickers[right_keep]
@@ -1,69 +1,264 @@
+import os
+import threading
 import torch
 import numpy as np
-from ultralytics import YOLO
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from model_registry import get_model
+from spatial_module import iou_matrix, resolve_sticker_conflicts
 
 MAIN_PATH = Path(__file__).resolve()
 resources_path = MAIN_PATH.resolve().parent.parent / "resources"
 
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
-left_model = YOLO(str(resources_path / "models/left_sticker.pt")).to(device)
-right_model = YOLO(str(resources_path / "models/right_sticker.pt")).to(device)
-
-def iou(box1, box2):
-    x1 = max(box1[0], box2[0])
-    y1 = max(box1[1], box2[1])
-    x2 = min(box1[2], box2[2])
-    y2 = min(box1[3], box2[3])
-    inter_area = max(0, x2 - x1) * max(0, y2 - y1)
-    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
-    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
-    union_area = area1 + area2 - inter_area
-    return inter_area / union_area if union_area > 0 else 0
+left_model_path = resources_path / "models/left_sticker.pt"
+right_model_path = resources_path / "models/right_sticker.pt"
+# Optional single two-class sticker model (one "left" and one "right" class) replacing both models above
+merged_model_path = os.getenv('STICKER_MODEL')
+
+def get_sticker_models():
+    """Return the (left, right) sticker models, loading them into the shared registry on first use"""
+    return get_model(left_model_path, device), get_model(right_model_path, device)
 
 def box_inside(outer, inner):
     return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
 
-def resolve_sticker_conflicts(left_boxes, right_boxes, iou_threshold=0.5):
-    resolved_left = []
-    resolved_right = []
-    used_right = set()
-
-    for i, lbox in enumerate(left_boxes):
-        best_j = -1
-        best_overlap = 0
-        for j, rbox in enumerate(right_boxes):
-            if j in used_right:
-                continue
-            score = iou(lbox.xyxy[0].cpu().numpy(), rbox.xyxy[0].cpu().numpy())
-            if score > best_overlap:
-                best_overlap = score
-                best_j = j
-
-        if best_overlap > iou_threshold:
-            if lbox.conf[0] > right_boxes[best_j].conf[0]:
-                resolved_left.append(lbox)
-            else:
-                resolved_right.append(right_boxes[best_j])
-            used_right.add(best_j)
+def boxes_to_array(boxes):
+    """Convert ultralytics Boxes to an (N, 6) array of x1, y1, x2, y2, conf, cls in one transfer"""
+    if len(boxes) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+    return torch.cat([boxes.xyxy, boxes.conf[:, None], boxes.cls[:, None]], dim=1).cpu().numpy()
+
+def suppress_duplicates(stickers, iou_threshold=0.7):
+    """Drop lower-confidence copies of the same sticker, e.g. seen through two overlapping crops"""
+    if len(stickers) < 2:
+        return stickers
+    overlaps = iou_matrix(stickers, stickers) > iou_threshold
+    keep = np.zeros(len(stickers), dtype=bool)
+    for i in np.argsort(-stickers[:, 4]):
+        if not (overlaps[i] & keep).any():
+            keep[i] = True
+    return stickers[keep]
+
+class StickerDetector:
+    """
+    Detects left and right stickers in a single pass over the frame
+
+    With a merged two-class model both sticker types come out of one
+    prediction. Otherwise the left and right models run concurrently on a
+    two-worker thread pool, since inference releases the GIL.
+
+    Detection can be restricted to crops around part boxes. Crops are
+    batched through the models at roi_imgsz, which for small parts is a
+    higher effective resolution than the full frame, and detections are
+    mapped back to frame coordinates.
+    """
+
+    def __init__(self, merged_model_path=None, roi_imgsz=320, roi_margin=0.1):
+        self.merged_model_path = merged_model_path
+        self.roi_imgsz = roi_imgsz
+        self.roi_margin = roi_margin  # Crop margin around each part, as a fraction of its size
+        self.executor = None
+        if merged_model_path is None:
+            self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="StickerDetector")
+
+    def _merged_class_ids(self, model):
+        """Class ids of the left and right stickers in the merged model"""
+        names = {int(k): str(v).lower() for k, v in model.names.items()}
+        left_id = next((k for k, v in names.items() if 'left' in v), 0)
+        right_id = next((k for k, v in names.items() if 'right' in v), 1)
+        return left_id, right_id
+
+    def _crop_regions(self, frame, part_boxes):
+        """Integer crop windows around each part box, clipped to the frame"""
+        height, width = frame.shape[:2]
+        regions = []
+        for x1, y1, x2, y2 in part_boxes[:, :4]:
+            margin_x = max(8, (x2 - x1) * self.roi_margin)
+            margin_y = max(8, (y2 - y1) * self.roi_margin)
+            cx1 = int(max(0, x1 - margin_x))
+            cy1 = int(max(0, y1 - margin_y))
+            cx2 = int(min(width, x2 + margin_x))
+            cy2 = int(min(height, y2 + margin_y))
+            if cx2 > cx1 and cy2 > cy1:
+                regions.append((cx1, cy1, cx2, cy2))
+        return regions
+
+    def _run(self, model, images, imgsz, offsets):
+        """Predict on one image or a batch and return frame-space (N, 6) detections"""
+        results = model.predict(images, imgsz=imgsz, verbose=False) if imgsz else model.predict(images, verbose=False)
+        arrays = []
+        for result, (offset_x, offset_y) in zip(results, offsets):
+            detections = boxes_to_array(result.boxes)
+            detections[:, [0, 2]] += offset_x
+            detections[:, [1, 3]] += offset_y
+            arrays.append(detections)
+        return np.concatenate(arrays) if arrays else np.zeros((0, 6), dtype=np.float32)
+
+    def predict(self, frame, part_boxes=None):
+        """
+        Return raw (left, right) detections as (N, 6) frame-space arrays
+
+        Args:
+            frame: BGR frame
+            part_boxes: optional (P, 4+) array of part boxes; only crops around them are searched
+        """
+        if part_boxes is None:
+            images, imgsz, offsets = frame, None, [(0, 0)]
         else:
-            resolved_left.append(lbox)
+            regions = self._crop_regions(frame, np.asarray(part_boxes, dtype=np.float32).reshape(-1, 4))
+            if not regions:
+                empty = np.zeros((0, 6), dtype=np.float32)
+                return empty, empty
+            images = [np.ascontiguousarray(frame[y1:y2, x1:x2]) for x1, y1, x2, y2 in regions]
+            imgsz, offsets = self.roi_imgsz, [(x1, y1) for x1, y1, _, _ in regions]
+
+        if self.merged_model_path is not None:
+            model = get_model(self.merged_model_path, device)
+            detections = self._run(model, images, imgsz, offsets)
+            left_id, right_id = self._merged_class_ids(model)
+            return detections[detections[:, 5] == left_id], detections[detections[:, 5] == right_id]
+
+        left_model, right_model = get_sticker_models()
+        left_future = self.executor.submit(self._run, left_model, images, imgsz, offsets)
+        right_future = self.executor.submit(self._run, right_model, images, imgsz, offsets)
+        return left_future.result(), right_future.result()
+
+    def detect(self, frame, conf_threshold=0.8, iou_threshold=0.5, part_boxes=None):
+        """
+        Detect stickers on the whole frame or only around part_boxes
+
+        Returns:
+            tuple: (left, right) arrays of shape (N, 5): x1, y1, x2, y2, conf in frame coordinates
+        """
+        left_results, right_results = self.predict(frame, part_boxes)
+
+        left_filtered = left_results[left_results[:, 4] >= conf_threshold, :5]
+        right_filtered = right_results[right_results[:, 4] >= conf_threshold, :5]
+        if part_boxes is not None:
+            left_filtered = suppress_duplicates(left_filtered)
+            right_filtered = suppress_duplicates(right_filtered)
+
+        # Resolve overlapping sticker detections
+        resolved_left, resolved_right = resolve_sticker_conflicts(left_filtered, right_filtered, iou_threshold)
+
+        return resolved_left, resolved_right
+
+def containment_matrix(part_boxes, stickers):
+    """
+    (parts, stickers) boolean matrix: True where a sticker's centre lies inside a part box
+
+    Args:
+        part_boxes: (P, 4+) array of x1, y1, x2, y2
+        stickers: (S, 4+) array of x1, y1, x2, y2
+    """
+    part_boxes = np.asarray(part_boxes, dtype=np.float32)
+    cx = (stickers[:, 0] + stickers[:, 2]) / 2
+    cy = (stickers[:, 1] + stickers[:, 3]) / 2
+    return ((part_boxes[:, 0:1] <= cx) & (cx <= part_boxes[:, 2:3]) &
+            (part_boxes[:, 1:2] <= cy) & (cy <= part_boxes[:, 3:4]))
+
+def stickers_in_box(stickers, box):
+    """Boolean mask of stickers whose centre lies inside box (x1, y1, x2, y2)"""
+    return containment_matrix(np.asarray(box)[None, :4], stickers)[0]
+
+class StickerVerdictCache:
+    """
+    Per-track cache of the stickers found on each part
+
+    A part's sticker does not change while it travels down the belt. Once the
+    same verdict (number of left and right stickers on the part) has been seen
+    confirm_frames times in a row, the part's stickers are served from the
+    cache, following the part's box, instead of running the sticker models.
+    The verdict is re-verified every reverify_interval frames, or as soon as
+    the box size changes by more than geometry_tolerance. Entries are evicted
+    when their track disappears.
+    """
+
+    def __init__(self, confirm_frames=3, reverify_interval=15, geometry_tolerance=0.2):
+        self.confirm_frames = confirm_frames
+        self.reverify_interval = reverify_interval
+        self.geometry_tolerance = geometry_tolerance
+        self.entries = {}  # track_id -> cache entry dict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _geometry_changed(self, entry, box):
+        ref_w, ref_h = entry['size']
+        w, h = box[2] - box[0], box[3] - box[1]
+        return (abs(w - ref_w) > self.geometry_tolerance * max(ref_w, 1) or
+                abs(h - ref_h) > self.geometry_tolerance * max(ref_h, 1))
+
+    def needs_detection(self, track_id, box, frame_index):
+        """True if the part's stickers have to be (re)detected this frame"""
+        entry = self.entries.get(track_id)
+        if (entry is None or not entry['confirmed'] or
+                frame_index - entry['verified_frame'] >= self.reverify_interval or
+                self._geometry_changed(entry, box)):
+            self.misses += 1
+            return True
+        self.hits += 1
+        return False
+
+    def update(self, track_id, box, left_stickers, right_stickers, frame_index):
+        """Store freshly detected stickers for a part, given as frame-space (N, 5) arrays"""
+        verdict = (len(left_stickers), len(right_stickers))
+        entry = self.entries.get(track_id)
+        if entry is None or entry['verdict'] != verdict:
+            entry = {'verdict': verdict, 'streak': 0, 'confirmed': False}
+            self.entries[track_id] = entry
+        entry['streak'] += 1
+        entry['confirmed'] = entry['streak'] >= self.confirm_frames
+        entry['verified_frame'] = frame_index
+
+        # Keep sticker boxes relative to the part box so they follow it along the belt
+        w, h = max(box[2] - box[0], 1), max(box[3] - box[1], 1)
+        origin = np.array([box[0], box[1], box[0], box[1]], dtype=np.float32)
+        scale = np.array([w, h, w, h], dtype=np.float32)
+        entry['size'] = (box[2] - box[0], box[3] - box[1])
+        entry['left'] = np.hstack([(left_stickers[:, :4] - origin) / scale, left_stickers[:, 4:5]])
+        entry['right'] = np.hstack([(right_stickers[:, :4] - origin) / scale, right_stickers[:, 4:5]])
+
+    def cached_stickers(self, track_id, box):
+        """Cached (left, right) stickers of a part, placed at its current box"""
+        entry = self.entries[track_id]
+        w, h = max(box[2] - box[0], 1), max(box[3] - box[1], 1)
+        origin = np.array([box[0], box[1], box[0], box[1]], dtype=np.float32)
+        scale = np.array([w, h, w, h], dtype=np.float32)
+        left = np.hstack([entry['left'][:, :4] * scale + origin, entry['left'][:, 4:5]])
+        right = np.hstack([entry['right'][:, :4] * scale + origin, entry['right'][:, 4:5]])
+        return left.astype(np.float32), right.astype(np.float32)
 
-    for j, rbox in enumerate(right_boxes):
-        if j not in used_right:
-            resolved_right.append(rbox)
+    def retain(self, track_ids):
+        """Evict entries of tracks that are no longer visible"""
+        for track_id in [tid for tid in self.entries if tid not in track_ids]:
+            del self.entries[track_id]
+            self.evictions += 1
 
-    return resolved_left, resolved_right
+    def clear(self):
+        self.entries.clear()
 
-def detect_stickers(frame, conf_threshold=0.8, iou_threshold=0.5):
-    left_results = left_model.predict(frame, verbose=False)[0].boxes
-    right_results = right_model.predict(frame, verbose=False)[0].boxes
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions
+        }
 
-    left_filtered = [box for box in left_results if box.conf[0] >= conf_threshold]
-    right_filtered = [box for box in right_results if box.conf[0] >= conf_threshold]
+_detector = None
+_detector_lock = threading.Lock()
 
-    # Resolve overlapping sticker detections
-    resolved_left, resolved_right = resolve_sticker_conflicts(left_filtered, right_filtered, iou_threshold)
+def get_sticker_detector():
+    """Return the shared StickerDetector, created on first use"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = StickerDetector(merged_model_path=merged_model_path)
+        return _detector
 
-    return resolved_left, resolved_right
-    return left_filtered, right_filtered
+def detect_stickers(frame, conf_threshold=0.8, iou_threshold=0.5, part_boxes=None):
+    return get_sticker_detector().detect(frame, conf_threshold, iou_threshold, part_boxes)
@@ -0,0 +1,335 @@
+import hashlib
+import os
+from functools import partial
+from pathlib import Path
+import cv2
+import numpy as np
+
+MAIN_PATH = Path(__file__).resolve()
+resources_path = MAIN_PATH.resolve().parent.parent / "resources"
+template_cache_dir = resources_path / "template_cache"
+# Template banks kept in template_cache_dir; the least recently used ones are deleted beyond this
+TEMPLATE_CACHE_SIZE = int(os.getenv('TEMPLATE_CACHE_SIZE', '4'))
+
+CACHE_VERSION = 2
+
+
+def to_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def best_match(image, templates):
+    """Best TM_CCOEFF_NORMED score of a grayscale image over a stack of grayscale templates"""
+    best_score = -1
+    for template in templates:
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, _ = cv2.minMaxLoc(result)
+        best_score = max(best_score, max_val)
+    return best_score
+
+
+def rotate_image(image, angle):
+    """Rotate image by angle degrees around its centre, keeping its size"""
+    h, w = image.shape[:2]
+    center = (w // 2, h // 2)
+    rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+    return cv2.warpAffine(image, rotation_matrix, (w, h))
+
+
+class TemplateBank:
+    """
+    Grayscale, mirrored and rotated variants of the base images, built once
+
+    Each reference ('right', 'right_mirror', 'left', 'left_mirror') holds
+    one grayscale template per angle. Banks are saved to template_cache_dir
+    keyed by a hash of the base image pixels, so later runs over the same
+    base image files (batch evaluation, restarts without recapturing) load
+    them instead of rebuilding. Recaptured base images never hash the same,
+    so only the TEMPLATE_CACHE_SIZE most recently used banks are kept.
+    """
+
+    def __init__(self, right_base, left_base, angle_step=15, cache_dir=template_cache_dir):
+        self.angle_step = angle_step
+        self.angles = np.arange(0, 360, angle_step, dtype=np.float32)
+        self.templates = {}  # name -> (angles, h, w) uint8
+        self.key = self._hash(right_base, left_base)
+        self.loaded_from_cache = False
+
+        cache_path = Path(cache_dir) / f"{self.key}.npz" if cache_dir is not None else None
+        if cache_path is not None and cache_path.exists():
+            try:
+                self._load(cache_path)
+                self.loaded_from_cache = True
+                os.utime(cache_path)  # Mark as recently used so pruning keeps it
+                return
+            except Exception as e:
+                print(f"Ignoring unreadable template cache {cache_path}: {e}")
+
+        self._build(right_base, left_base)
+        if cache_path is not None:
+            self._save(cache_path)
+
+    def _hash(self, right_base, left_base):
+        sha1 = hashlib.sha1(f"v{CACHE_VERSION}:{self.angle_step}".encode())
+        for image in (right_base, left_base):
+            sha1.update(str(image.shape).encode())
+            sha1.update(np.ascontiguousarray(image).tobytes())
+        return sha1.hexdigest()
+
+    def _build(self, right_base, left_base):
+        references = {
+            'right': right_base,
+            'right_mirror': cv2.flip(right_base, 1),
+            'left': left_base,
+            'left_mirror': cv2.flip(left_base, 1),
+        }
+        for name, image in references.items():
+            gray = to_gray(image)
+            self.templates[name] = np.stack([rotate_image(gray, angle) for angle in self.angles])
+
+    def _save(self, path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            arrays = {f"template_{name}": templates for name, templates in self.templates.items()}
+            np.savez_compressed(path, angles=self.angles, **arrays)
+            self._prune(path.parent)
+        except OSError as e:
+            print(f"Could not save template cache {path}: {e}")
+
+    @staticmethod
+    def _prune(cache_dir, keep=TEMPLATE_CACHE_SIZE):
+        """Delete all but the keep most recently used banks in cache_dir"""
+        banks = sorted(Path(cache_dir).glob("*.npz"), key=lambda bank: bank.stat().st_mtime, reverse=True)
+        for bank in banks[keep:]:
+            try:
+                bank.unlink()
+            except OSError as e:
+                print(f"Could not remove old template cache {bank}: {e}")
+
+    def _load(self, path):
+        with np.load(path) as data:
+            self.angles = data['angles']
+            for key in data.files:
+                if key.startswith("template_"):
+                    self.templates[key[len("template_"):]] = data[key]
+
+    def references_for_box(self, box_idx):
+        """(right, left) reference names compared against a crop of the right (0) or left (1) box"""
+        return ('right', 'right_mirror') if box_idx == 0 else ('left_mirror', 'left')
+
+
+class ExhaustiveMatcher:
+    """Full-resolution template match at every angle of the bank"""
+
+    def __init__(self, bank, right_base=None, left_base=None):
+        self.bank = bank
+        self.passes = 0  # Full-resolution correlation passes run so far
+
+    def score(self, crop_gray, reference):
+        templates = self.bank.templates[reference]
+        self.passes += len(templates)
+        return best_match(crop_gray, templates)
+
+    def jobs(self, crop_gray, reference):
+        """One scoring job per angle; the score is the maximum over the jobs' results"""
+        templates = self.bank.templates[reference]
+        self.passes += len(templates)
+        return [partial(best_match, crop_gray, templates[i:i + 1]) for i in range(len(templates))]
+
+
+class PyramidMatcher:
+    """
+    Coarse-to-fine template match
+
+    All bank angles are scored on a downsampled pyramid level first. Only
+    the top_k angles are then refined at full resolution, in refine_step
+    steps around each of them, which gives finer angular precision than the
+    bank with several times fewer full-resolution correlation passes.
+    """
+
+    def __init__(self, bank, right_base, left_base, levels=2, top_k=2, refine_step=5):
+        self.bank = bank
+        self.levels = levels
+        self.top_k = top_k
+        self.refine_step = refine_step
+        self.passes = 0
+        self.coarse_passes = 0
+        self.coarse = {name: np.stack([self._downsample(t) for t in templates])
+                       for name, templates in bank.templates.items()}
+        # Full-resolution templates at the refinement step, also kept in the template cache
+        self.fine = TemplateBank(right_base, left_base, angle_step=refine_step)
+        reach = int(bank.angle_step // (2 * refine_step))
+        self.offsets = np.arange(-reach, reach + 1) * refine_step  # e.g. -5, 0, 5 for 15 degree banks
+
+    def _downsample(self, image):
+        for _ in range(self.levels):
+            image = cv2.pyrDown(image)
+        return image
+
+    def score(self, crop_gray, reference):
+        small_crop = self._downsample(crop_gray)
+        coarse_templates = self.coarse[reference]
+        coarse_scores = np.array([
+            cv2.minMaxLoc(cv2.matchTemplate(small_crop, template, cv2.TM_CCOEFF_NORMED))[1]
+            for template in coarse_templates
+        ])
+        self.coarse_passes += len(coarse_templates)
+
+        candidates = self.bank.angles[np.argsort(-coarse_scores)[:self.top_k]]
+        fine_angles = (candidates[:, None] + self.offsets) % 360
+        fine_indices = np.unique(np.round(fine_angles / self.refine_step).astype(int) % len(self.fine.angles))
+        self.passes += len(fine_indices)
+        return best_match(crop_gray, self.fine.templates[reference][fine_indices])
+
+    def jobs(self, crop_gray, reference):
+        # The refinement depends on the coarse result, so a test is a single job
+        return [partial(self.score, crop_gray, reference)]
+
+
+class FFTMatcher:
+    """
+    Batched frequency-domain correlation against every rotation at once
+
+    The spectra of all rotated templates are computed once. A test takes one
+    forward FFT of the crop and one batched inverse FFT over the whole
+    rotation stack. Scores are normalized like TM_CCOEFF_NORMED, with window
+    means and energies taken from integral images of the templates. The
+    crop is slid inside the larger template, as matchTemplate does when the
+    template is bigger than the image.
+    """
+
+    def __init__(self, bank, right_base=None, left_base=None):
+        self.bank = bank
+        self.passes = 0  # Batched correlation passes run so far
+        self.spectra = {}  # name -> (angles, fft_h, fft_w // 2 + 1) complex64
+        self.fft_shapes = {}
+        self._window_norms = {}  # (name, crop shape) -> (angles, out_h, out_w) template window norms
+        for name, templates in bank.templates.items():
+            _, height, width = templates.shape
+            fft_shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+            self.fft_shapes[name] = fft_shape
+            self.spectra[name] = np.fft.rfft2(templates.astype(np.float32), s=fft_shape)
+
+    def _window_norm(self, name, crop_shape):
+        """Mean-removed L2 norm of every crop-sized window of every rotated template"""
+        key = (name, crop_shape)
+        if key not in self._window_norms:
+            h, w = crop_shape
+            templates = self.bank.templates[name].astype(np.float64)
+            sums = np.pad(templates.cumsum(1).cumsum(2), ((0, 0), (1, 0), (1, 0)))
+            squares = np.pad((templates ** 2).cumsum(1).cumsum(2), ((0, 0), (1, 0), (1, 0)))
+
+            def window(integral):
+                return integral[:, h:, w:] - integral[:, :-h, w:] - integral[:, h:, :-w] + integral[:, :-h, :-w]
+
+            energy = window(squares) - window(sums) ** 2 / (h * w)
+            self._window_norms[key] = np.sqrt(np.maximum(energy, 0)).astype(np.float32)
+        return self._window_norms[key]
+
+    def score(self, crop_gray, reference):
+        templates = self.bank.templates[reference]
+        h, w = crop_gray.shape
+        _, height, width = templates.shape
+        if h > height or w > width:
+            # Crop does not fit inside the template; use the direct correlation
+            self.passes += len(templates)
+            return best_match(crop_gray, templates)
+
+        crop = crop_gray.astype(np.float32)
+        crop -= crop.mean()
+        crop_norm = np.sqrt(np.square(crop).sum())
+        if crop_norm == 0:
+            return 0.0
+
+        fft_shape = self.fft_shapes[reference]
+        crop_spectrum = np.fft.rfft2(crop, s=fft_shape)
+        correlation = np.fft.irfft2(self.spectra[reference] * np.conj(crop_spectrum), s=fft_shape)
+        correlation = correlation[:, :height - h + 1, :width - w + 1]
+        self.passes += 1
+
+        window_norm = self._window_norm(reference, (h, w))
+        denominator = window_norm * crop_norm
+        scores = np.divide(correlation, denominator, out=np.zeros_like(correlation),
+                           where=denominator > 1e-3 * crop_norm)
+        return float(scores.max())
+
+    def jobs(self, crop_gray, reference):
+        # All rotations already run in one batched pass
+        return [partial(self.score, crop_gray, reference)]
+
+
+class ORBMatcher:
+    """
+    Rotation-invariant keypoint verifier
+
+    ORB descriptors of the unrotated base images and their mirrors are
+    computed once. A crop's descriptors are matched against a reference
+    with Lowe's ratio test, and score() returns the number of good matches.
+    normalize() turns the right and left counts into each side's share of
+    all good matches, so a warning needs a clear majority of keypoint
+    evidence for the other side rather than a correlation above threshold.
+    It is far cheaper than template matching but has little texture to work
+    with on small crops; check benchmark_template_engines.py before using it.
+    """
+
+    def __init__(self, bank, right_base=None, left_base=None, n_features=1000, ratio=0.8, patch_size=15,
+                 fast_threshold=10):
+        self.bank = bank
+        self.ratio = ratio
+        self.passes = 0
+        # Small patches and a low FAST threshold, since box crops are only about 130 px and weakly textured
+        self.orb = cv2.ORB_create(nfeatures=n_features, edgeThreshold=patch_size, patchSize=patch_size,
+                                  fastThreshold=fast_threshold)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        angle_zero = int(np.argmin(np.abs(bank.angles)))
+        self.descriptors = {}
+        for name, templates in bank.templates.items():
+            _, descriptors = self.orb.detectAndCompute(templates[angle_zero], None)
+            self.descriptors[name] = descriptors
+
+    def score(self, crop_gray, reference):
+        self.passes += 1
+        reference_descriptors = self.descriptors[reference]
+        _, descriptors = self.orb.detectAndCompute(crop_gray, None)
+        if descriptors is None or reference_descriptors is None or len(reference_descriptors) < 2:
+            return 0
+        good = 0
+        for pair in self.matcher.knnMatch(descriptors, reference_descriptors, k=2):
+            if len(pair) == 2 and pair[0].distance < self.ratio * pair[1].distance:
+                good += 1
+        return good
+
+    def jobs(self, crop_gray, reference):
+        return [partial(self.score, crop_gray, reference)]
+
+    def normalize(self, right_score, left_score):
+        """Good-match counts to (right, left) shares of all good matches"""
+        total = right_score + left_score
+        if total == 0:
+            return 0.0, 0.0
+        return right_score / total, left_score / total
+
+
+MATCHERS = {
+    'exhaustive': ExhaustiveMatcher,
+    'pyramid': PyramidMatcher,
+    'fft': FFTMatcher,
+    'orb': ORBMatcher,
+}
+# Every engine name create_matcher accepts; "embedding" registers itself in MATCHERS on first use
+MATCH_ENGINES = (*MATCHERS, 'embedding')
+
+
+def create_matcher(engine, bank, right_base, left_base, model=None):
+    """Template matching engine by name (see MATCHERS); engines with needs_model also get the part model"""
+    if engine == 'embedding' and engine not in MATCHERS:
+        # Needs torch; imported only when selected so the other engines work without it
+        import embedding_module  # noqa: F401  Registers the "embedding" match engine
+    if engine not in MATCHERS:
+        raise ValueError(f"Unknown match engine '{engine}', expected one of {', '.join(MATCH_ENGINES)}")
+    matcher_class = MATCHERS[engine]
+    if getattr(matcher_class, 'needs_model', False):
+        if model is None:
+            raise ValueError(f"Match engine '{engine}' needs the part model loaded in this process")
+        return matcher_class(bank, right_base, left_base, model)
+    return matcher_class(bank, right_base, left_base)
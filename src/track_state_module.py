@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+
+
+class TrackRecord:
+    """Everything the session remembers about one track id"""
+
+    __slots__ = ('track_id', 'last_seen', 'side', 'side_warning', 'counted', 'current_section',
+                 'previous_section', 'position', 'error_type', 'error_frames')
+
+    def __init__(self, track_id, now):
+        self.track_id = track_id
+        self.last_seen = now
+        self.side = 0  # 0 = unknown, 1 = right, 2 = left (placement test verdict)
+        self.side_warning = 0  # 1 once a side change warning has been raised
+        self.counted = False  # True while the track is counted in a vertical section
+        self.current_section = None
+        self.previous_section = None
+        self.position = None  # Last centre, for tracks matched by proximity
+        self.error_type = None  # Pending sticker error and its consecutive frame count
+        self.error_frames = 0
+
+    def clear_error(self):
+        self.error_type = None
+        self.error_frames = 0
+
+
+class TrackStateStore:
+    """
+    Per-track state keyed by arbitrary track ids, evicted by last-seen TTL
+
+    Records are kept in last-seen order, so touching a track and evicting
+    expired ones are O(1) per track. Memory stays bounded by the number of
+    tracks seen within the TTL, however long the session runs.
+    on_evict(record) is called for every record that expires.
+    """
+
+    def __init__(self, ttl=10.0, on_evict=None):
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.records = OrderedDict()  # track_id -> TrackRecord, least recently seen first
+        self.created = 0
+        self.evicted = 0
+        self.peak_size = 0
+        self._first_seen = None
+        self._last_now = None
+
+    def touch(self, track_id, now=None):
+        """Mark a track as seen now, creating its record if needed"""
+        now = time.time() if now is None else now
+        if self._first_seen is None:
+            self._first_seen = now
+        self._last_now = now
+        record = self.records.get(track_id)
+        if record is None:
+            record = self._create(track_id, now)
+        else:
+            record.last_seen = now
+            self.records.move_to_end(track_id)
+        return record
+
+    def get(self, track_id):
+        """Record of a track without refreshing it, created if the track is unknown"""
+        record = self.records.get(track_id)
+        if record is None:
+            record = self._create(track_id, self._last_now if self._last_now is not None else time.time())
+        return record
+
+    def peek(self, track_id):
+        """Record of a track, or None if it is unknown"""
+        return self.records.get(track_id)
+
+    def _create(self, track_id, now):
+        record = TrackRecord(track_id, now)
+        self.records[track_id] = record
+        self.created += 1
+        self.peak_size = max(self.peak_size, len(self.records))
+        return record
+
+    def remove(self, track_id):
+        return self.records.pop(track_id, None)
+
+    def evict_expired(self, now=None):
+        """Drop tracks not seen for ttl seconds; returns how many were evicted"""
+        now = time.time() if now is None else now
+        evicted = 0
+        while self.records:
+            track_id, record = next(iter(self.records.items()))
+            if now - record.last_seen <= self.ttl:
+                break
+            del self.records[track_id]
+            evicted += 1
+            if self.on_evict is not None:
+                self.on_evict(record)
+        self.evicted += evicted
+        return evicted
+
+    def values(self):
+        return list(self.records.values())
+
+    def clear(self):
+        self.records.clear()
+
+    def __contains__(self, track_id):
+        return track_id in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def stats(self):
+        elapsed = (self._last_now - self._first_seen) if self._first_seen is not None else 0.0
+        return {
+            'size': len(self.records),
+            'peak_size': self.peak_size,
+            'created': self.created,
+            'evicted': self.evicted,
+            'evictions_per_minute': self.evicted / elapsed * 60 if elapsed > 0 else 0.0,
+            'ttl': self.ttl
+        }
@@ -0,0 +1,177 @@
+import numpy as np
+from spatial_module import iou_matrix
+
+
+def _greedy_pairs(rows, cols, order):
+    """One-to-one (row, col) pairs taken in the given order"""
+    used_rows, used_cols = set(), set()
+    pairs = []
+    for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+        if i in used_rows or j in used_cols:
+            continue
+        used_rows.add(i)
+        used_cols.add(j)
+        pairs.append((i, j))
+    return pairs
+
+
+class IoUTracker:
+    """
+    NumPy-only part tracker fed by plain detections
+
+    Every track keeps its box and a smoothed velocity per step. Each step
+    moves all tracks by their velocity; on detection steps the predicted
+    boxes are matched one-to-one with the detections, highest IoU first,
+    and the tracks and detections left over are matched by centre distance.
+    Unmatched confident detections start new tracks, and tracks missed on
+    more than max_missed detection steps in a row are dropped. Between
+    detection steps predict() extrapolates the tracks, so part detection can
+    run at a lower cadence than the frame rate.
+
+    Output rows follow the tracked ultralytics boxes.data layout:
+    x1, y1, x2, y2, id, conf, cls.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=60, max_missed=10, min_conf=0.1,
+                 new_track_conf=0.5, velocity_smoothing=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance  # Centre distance in pixels for the fallback match
+        self.max_missed = max_missed
+        self.min_conf = min_conf  # Weaker detections are ignored
+        self.new_track_conf = new_track_conf  # Weaker detections only continue existing tracks
+        self.velocity_smoothing = velocity_smoothing
+        self.next_id = 1  # 0 means untracked in FrameDetections
+        self.reset()
+
+        # Statistics
+        self.steps = 0
+        self.detection_steps = 0
+        self.created = 0
+        self.dropped = 0
+
+    def reset(self):
+        """Forget every track; ids keep counting so they are never reused"""
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocity = np.zeros((0, 4), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.cls = np.zeros(0, dtype=np.float32)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.missed = np.zeros(0, dtype=np.int64)  # Detection steps in a row without a match
+        self.since_update = np.zeros(0, dtype=np.int64)  # Steps since the last matched detection
+        self.measured = np.zeros((0, 4), dtype=np.float32)  # Box of the last matched detection
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _step(self):
+        self.steps += 1
+        self.boxes += self.velocity
+        self.since_update += 1
+
+    def _match(self, detections):
+        """(track indices, detection indices) of matched pairs"""
+        if len(self.ids) == 0 or len(detections) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        ious = iou_matrix(self.boxes, detections)
+        rows, cols = np.nonzero(ious > self.iou_threshold)
+        pairs = _greedy_pairs(rows, cols, np.argsort(-ious[rows, cols], kind='stable'))
+
+        # Fast parts can leave their predicted box; fall back to centre distance for the rest
+        free_tracks = np.setdiff1d(np.arange(len(self.ids)), [i for i, _ in pairs])
+        free_detections = np.setdiff1d(np.arange(len(detections)), [j for _, j in pairs])
+        if len(free_tracks) and len(free_detections):
+            track_centers = (self.boxes[free_tracks, :2] + self.boxes[free_tracks, 2:]) / 2
+            detection_centers = (detections[free_detections, :2] + detections[free_detections, 2:]) / 2
+            distances = np.linalg.norm(track_centers[:, None] - detection_centers[None], axis=2)
+            rows, cols = np.nonzero(distances < self.max_distance)
+            for i, j in _greedy_pairs(rows, cols, np.argsort(distances[rows, cols], kind='stable')):
+                pairs.append((free_tracks[i], free_detections[j]))
+
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def update(self, data):
+        """
+        Advance one step with this frame's detections
+
+        Args:
+            data: (N, 6) x1, y1, x2, y2, conf, cls from model.predict (an id column is ignored)
+
+        Returns:
+            np.ndarray: (M, 7) tracked boxes of the tracks matched this step
+        """
+        self._step()
+        self.detection_steps += 1
+        data = np.asarray(data, dtype=np.float32)
+        if len(data) == 0:
+            data = np.zeros((0, 6), dtype=np.float32)
+        data = data[data[:, -2] >= self.min_conf]
+        detections, conf, classes = data[:, :4], data[:, -2], data[:, -1]
+
+        track_idx, detection_idx = self._match(detections)
+        if len(track_idx):
+            # Velocity from the displacement since the last matched detection, smoothed over updates
+            displacement = (detections[detection_idx] - self.measured[track_idx]) / self.since_update[track_idx, None]
+            first = self.hits[track_idx, None] == 1
+            self.velocity[track_idx] = np.where(
+                first, displacement,
+                self.velocity_smoothing * self.velocity[track_idx] + (1 - self.velocity_smoothing) * displacement)
+            self.boxes[track_idx] = self.measured[track_idx] = detections[detection_idx]
+            self.conf[track_idx] = conf[detection_idx]
+            self.cls[track_idx] = classes[detection_idx]
+            self.hits[track_idx] += 1
+            self.since_update[track_idx] = 0
+
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[track_idx] = True
+        self.missed = np.where(matched, 0, self.missed + 1)
+
+        keep = self.missed <= self.max_missed
+        self.dropped += int((~keep).sum())
+        self._select(keep)
+
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[detection_idx] = False
+        new = np.flatnonzero(unmatched & (conf >= self.new_track_conf))
+        if len(new):
+            self._add(detections[new], conf[new], classes[new])
+        return self._output()
+
+    def predict(self):
+        """Advance one step without detections; returns the extrapolated boxes of the active tracks"""
+        self._step()
+        return self._output()
+
+    def _select(self, keep):
+        for name in ('boxes', 'velocity', 'ids', 'conf', 'cls', 'hits', 'missed', 'since_update', 'measured'):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _add(self, boxes, conf, classes):
+        count = len(boxes)
+        self.boxes = np.concatenate([self.boxes, boxes])
+        self.measured = np.concatenate([self.measured, boxes])
+        self.velocity = np.concatenate([self.velocity, np.zeros((count, 4), dtype=np.float32)])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count)])
+        self.conf = np.concatenate([self.conf, conf])
+        self.cls = np.concatenate([self.cls, classes])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        self.missed = np.concatenate([self.missed, np.zeros(count, dtype=np.int64)])
+        self.since_update = np.concatenate([self.since_update, np.zeros(count, dtype=np.int64)])
+        self.next_id += count
+        self.created += count
+
+    def _output(self):
+        active = self.missed == 0
+        return np.hstack([self.boxes[active], self.ids[active, None].astype(np.float32),
+                          self.conf[active, None], self.cls[active, None]])
+
+    def stats(self):
+        return {
+            'tracks': len(self.ids),
+            'created': self.created,
+            'dropped': self.dropped,
+            'steps': self.steps,
+            'detection_steps': self.detection_steps
+        }
@@ -0,0 +1,116 @@
+import threading
+import time
+import numpy as np
+from model_registry import get_model
+from sticker_module import detect_stickers
+
+DEFAULT_FRAME_SHAPE = (480, 640, 3)
+
+
+class ModelWarmer:
+    """
+    Preloads models and runs dummy inferences on a background thread
+
+    While the operator is still logging in or choosing a model, the selected
+    part model and the sticker models are loaded into the shared registry and
+    run on blank frames at the camera resolution. This moves lazy predictor
+    setup, layer fusing and buffer allocation off the first live frames.
+    Only the most recent request is kept if several arrive while busy.
+    """
+
+    def __init__(self, frame_shape=DEFAULT_FRAME_SHAPE, warmup_runs=2):
+        self.frame_shape = tuple(frame_shape)
+        self.warmup_runs = warmup_runs
+        self._pending = None
+        self._busy = False
+        self._warmed = {}  # (model_path, frame_shape) -> warm-up seconds; model_path None = sticker models
+        self._failed = set()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="ModelWarmer", daemon=True)
+        self._thread.start()
+
+    def request(self, model_path=None, frame_shape=None):
+        """Queue a warm-up of the sticker models and, if given, the part model at model_path"""
+        if frame_shape is not None:
+            self.frame_shape = tuple(frame_shape)
+        with self._cond:
+            self._pending = (str(model_path) if model_path is not None else None, self.frame_shape)
+            self._cond.notify_all()
+
+    def status(self, model_path):
+        """'ready', 'failed' or 'warming' for a part model at the current frame shape"""
+        key = (str(model_path), self.frame_shape)
+        with self._cond:
+            if key in self._warmed:
+                return 'ready'
+            if key in self._failed:
+                return 'failed'
+            return 'warming'
+
+    def warmup_time(self, model_path):
+        """Seconds the last warm-up of model_path took, or None"""
+        with self._cond:
+            return self._warmed.get((str(model_path), self.frame_shape))
+
+    def wait(self, timeout=None):
+        """Block until all queued warm-ups have finished; returns False on timeout"""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._cond:
+            while self._pending is not None or self._busy:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                model_path, frame_shape = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                self._warm(model_path, frame_shape)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _warm(self, model_path, frame_shape):
+        dummy_frame = np.zeros(frame_shape, dtype=np.uint8)
+        # One part box in the middle of the frame exercises the cropped sticker path too
+        height, width = frame_shape[:2]
+        dummy_parts = np.array([[width // 4, height // 4, 3 * width // 4, 3 * height // 4]], dtype=np.float32)
+
+        if (None, frame_shape) not in self._warmed:
+            start_time = time.time()
+            try:
+                for _ in range(self.warmup_runs):
+                    detect_stickers(dummy_frame)
+                    detect_stickers(dummy_frame, part_boxes=dummy_parts)
+            except Exception as e:
+                print(f"Sticker model warm-up failed: {e}")
+            else:
+                with self._cond:
+                    self._warmed[(None, frame_shape)] = time.time() - start_time
+                print(f"Sticker models warmed up in {time.time() - start_time:.2f}s")
+
+        if model_path is None or (model_path, frame_shape) in self._warmed:
+            return
+
+        start_time = time.time()
+        try:
+            model = get_model(model_path)
+            for _ in range(self.warmup_runs):
+                # Tracking initializes the tracker too; Comparer resets it before the session starts
+                model.track(dummy_frame, verbose=False, persist=True)
+        except Exception as e:
+            print(f"Warm-up of {model_path} failed: {e}")
+            with self._cond:
+                self._failed.add((model_path, frame_shape))
+            return
+        with self._cond:
+            self._warmed[(model_path, frame_shape)] = time.time() - start_time
+        print(f"Model {model_path} warmed up in {time.time() - start_time:.2f}s at {frame_shape[1]}x{frame_shape[0]}")
@@ -0,0 +1,105 @@
+import json
+import os
+import cv2
+import numpy as np
+
+# Optional JSON file describing the zones of this line, e.g.
+# {"test_zones": [[[35, 120], [165, 120], [165, 250], [35, 250]], ...], "sections": 4}
+# "sections" is a lane count or a list of polygons; missing keys fall back to the defaults below
+ZONE_LAYOUT = os.getenv('ZONE_LAYOUT')
+
+TEST_BOXES = [
+    [(35, 120), (165, 250)],  # Right box
+    [(450, 120), (580, 250)]   # Left box
+]
+SECTION_COUNT = 3
+
+
+def box_polygon(box):
+    """Corners of a [(x1, y1), (x2, y2)] box"""
+    (x1, y1), (x2, y2) = box
+    return [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+
+
+def polygon_bounds(polygon):
+    """Bounding box [(x1, y1), (x2, y2)] of a polygon"""
+    points = np.asarray(polygon, dtype=np.int32).reshape(-1, 2)
+    return [tuple(points.min(axis=0).tolist()), tuple(points.max(axis=0).tolist())]
+
+
+def vertical_lanes(count, frame_width, frame_height):
+    """count full-height lanes of frame_width // count pixels; the last one takes the remainder"""
+    lane_width = frame_width // count
+    lanes = []
+    for lane in range(count):
+        x1 = lane * lane_width
+        x2 = frame_width - 1 if lane == count - 1 else x1 + lane_width - 1
+        lanes.append([(x1, 0), (x2, 0), (x2, frame_height - 1), (x1, frame_height - 1)])
+    return lanes
+
+
+def load_zone_config(path=ZONE_LAYOUT):
+    """(test zone polygons, section lane count or polygons) from the ZONE_LAYOUT file or the defaults"""
+    config = {}
+    if path:
+        with open(path) as config_file:
+            config = json.load(config_file)
+        print(f"Zone layout loaded from {path}")
+    test_zones = config.get('test_zones', [box_polygon(box) for box in TEST_BOXES])
+    return test_zones, config.get('sections', SECTION_COUNT)
+
+
+class ZoneLayout:
+    """
+    N polygon zones rasterized once into a zone-id lookup mask
+
+    Every pixel (or every downsample x downsample block) of the mask holds
+    the id of the zone covering it, -1 for none; where zones overlap the
+    lower id wins. Looking up the zone of any number of points is a single
+    array gather, so the cost does not grow with the number of zones or
+    their shape.
+    """
+
+    def __init__(self, zones, frame_width, frame_height, downsample=1):
+        self.zones = [np.asarray(zone, dtype=np.int32).reshape(-1, 2) for zone in zones]
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.downsample = downsample
+        self.mask = np.full((-(-frame_height // downsample), -(-frame_width // downsample)), -1, dtype=np.int16)
+        # Fill the highest id first so lower ids stay on top where zones overlap
+        for zone_id in reversed(range(len(self.zones))):
+            cv2.fillPoly(self.mask, [self.zones[zone_id] // downsample], zone_id)
+
+    @classmethod
+    def lanes(cls, sections, frame_width, frame_height, downsample=1):
+        """Layout from a lane count (equal full-height lanes) or a list of polygons"""
+        if isinstance(sections, int):
+            sections = vertical_lanes(sections, frame_width, frame_height)
+        return cls(sections, frame_width, frame_height, downsample)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def zone_of(self, points):
+        """Zone id of each (x, y) point, -1 outside every zone and outside the frame"""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        x = np.floor(points[:, 0]).astype(np.int64)
+        y = np.floor(points[:, 1]).astype(np.int64)
+        inside = (x >= 0) & (x < self.frame_width) & (y >= 0) & (y < self.frame_height)
+        zone_ids = np.full(len(points), -1, dtype=np.int64)
+        zone_ids[inside] = self.mask[y[inside] // self.downsample, x[inside] // self.downsample]
+        return zone_ids
+
+    def zone_at(self, x, y):
+        """Zone id of a single point, or None outside every zone"""
+        zone_id = int(self.zone_of((x, y))[0])
+        return zone_id if zone_id >= 0 else None
+
+    def counts(self, points):
+        """Number of points in each zone"""
+        zone_ids = self.zone_of(points)
+        return np.bincount(zone_ids[zone_ids >= 0], minlength=len(self.zones))
+
+    def bounds(self, zone_id):
+        """Bounding box [(x1, y1), (x2, y2)] of a zone"""
+        return polygon_bounds(self.zones[zone_id])
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy IoU part tracker
+Tests id stability on moving boxes and dropping tracks after max_missed
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from tracker_module import IoUTracker
+
+
+def make_detections(step, rng, count=4, speed=8.0, jitter=1.0):
+    """(count, 6) x1, y1, x2, y2, conf, cls of parts moving right along the belt"""
+    rows = []
+    for index in range(count):
+        x = 40 + index * 140 + speed * step + rng.normal(0, jitter)
+        y = 200 + rng.normal(0, jitter)
+        rows.append([x, y, x + 80, y + 60, 0.9, index % 2])
+    return np.array(rows, dtype=np.float32)
+
+
+def test_ids_stable_on_moving_boxes():
+    """Every part keeps its id while it moves, at every frame and with detection every 3rd frame"""
+    rng = np.random.default_rng(0)
+    for interval in (1, 3):
+        tracker = IoUTracker()
+        ids_per_part = [set() for _ in range(4)]
+        for step in range(60):
+            if step % interval:
+                output = tracker.predict()
+                assert len(output) == 4
+                continue
+            detections = make_detections(step, rng)
+            output = tracker.update(detections)
+            assert output.shape == (4, 7)
+            # Match output rows to parts by box position
+            for row in output:
+                part = int(np.argmin(np.abs(detections[:, 0] - row[0])))
+                ids_per_part[part].add(int(row[4]))
+        print(f"Interval {interval}: ids per part {[sorted(ids) for ids in ids_per_part]}")
+        assert all(len(ids) == 1 for ids in ids_per_part)
+        assert len(set().union(*ids_per_part)) == 4
+        assert tracker.stats()['created'] == 4
+
+
+def test_tracks_dropped_after_max_missed():
+    """A part missed on more than max_missed detection steps is dropped; when it returns it gets a new id"""
+    rng = np.random.default_rng(1)
+    tracker = IoUTracker(max_missed=3)
+    for step in range(5):
+        tracker.update(make_detections(step, rng, count=2))
+    first_ids = sorted(tracker.ids.tolist())
+
+    # Part 0 leaves; part 1 stays in view
+    for missed in range(1, 5):
+        output = tracker.update(make_detections(5, rng, count=2)[1:])
+        assert len(output) == 1  # Only matched tracks are reported
+        if missed <= 3:
+            assert len(tracker) == 2, f"track dropped after {missed} missed steps"
+        else:
+            assert len(tracker) == 1
+    assert tracker.stats()['dropped'] == 1
+    print(f"Part 0 dropped after 4 missed detection steps, remaining ids {tracker.ids.tolist()}")
+
+    # Part 0 comes back: a new id, never a reused one
+    output = tracker.update(make_detections(5, rng, count=2))
+    assert len(output) == 2
+    new_ids = set(output[:, 4].astype(int).tolist()) - set(first_ids)
+    assert len(new_ids) == 1 and min(new_ids) > max(first_ids)
+
+
+if __name__ == "__main__":
+    test_ids_stable_on_moving_boxes()
+    test_tracks_dropped_after_max_missed()
+    print("IoU tracker test completed!")
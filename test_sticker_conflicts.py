@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for matrix-based sticker conflict resolution
+Compares resolve_sticker_conflicts with the previous pairwise scan
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from benchmark_sticker_conflicts import make_stickers, resolve_pairwise
+from spatial_module import match_sticker_conflicts, resolve_sticker_conflicts
+
+
+def sorted_rows(stickers):
+    """Rows in a fixed order; the pairwise scan appends conflict winners before the other right stickers"""
+    return stickers[np.lexsort(stickers.T[::-1])]
+
+
+def random_stickers(count, rng, area=100, size=40):
+    """Stickers crowded into a small area, so one sticker often overlaps several of the other side"""
+    corners = rng.uniform(0, area, size=(count, 2))
+    return np.hstack([corners, corners + size, rng.uniform(0.5, 1.0, (count, 1))]).astype(np.float32)
+
+
+def test_matches_pairwise_resolution():
+    """Same surviving stickers as the pairwise scan, on benchmark frames and on crowded frames"""
+    rng = np.random.default_rng(0)
+    cases = [make_stickers(count, rng) for count in (0, 1, 2, 5, 10, 20, 50, 100, 200) for _ in range(20)]
+    cases += [(random_stickers(int(rng.integers(0, 8)), rng), random_stickers(int(rng.integers(0, 8)), rng))
+              for _ in range(500)]
+
+    conflicts = 0
+    for left, right in cases:
+        expected_left, expected_right = resolve_pairwise(left, right)
+        resolved_left, resolved_right = resolve_sticker_conflicts(left, right)
+        assert np.array_equal(sorted_rows(resolved_left), sorted_rows(expected_left))
+        assert np.array_equal(sorted_rows(resolved_right), sorted_rows(expected_right))
+        conflicts += len(left) + len(right) - len(resolved_left) - len(resolved_right)
+    print(f"{len(cases)} frames match the pairwise resolution, {conflicts} conflicting stickers dropped")
+
+
+def test_match_indices():
+    """Index arrays of the survivors; the less confident sticker of an overlapping pair is dropped"""
+    left = np.array([[0, 0, 40, 40, 0.9],
+                     [200, 200, 240, 240, 0.6]], dtype=np.float32)
+    right = np.array([[2, 1, 42, 41, 0.8],
+                      [201, 200, 241, 240, 0.7],
+                      [400, 400, 440, 440, 0.95]], dtype=np.float32)
+    left_keep, right_keep = match_sticker_conflicts(left, right)
+    assert left_keep.tolist() == [0]
+    assert right_keep.tolist() == [1, 2]
+
+    empty = np.zeros((0, 5), dtype=np.float32)
+    left_keep, right_keep = match_sticker_conflicts(empty, right)
+    assert left_keep.tolist() == [] and right_keep.tolist() == [0, 1, 2]
+
+
+if __name__ == "__main__":
+    test_matches_pairwise_resolution()
+    test_match_indices()
+    print("Sticker conflict test completed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for TTL eviction in the track state store
+Tests expiry by last-seen time and a track id returning after eviction
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from track_state_module import TrackStateStore
+
+
+def test_track_state_store():
+    """Expire tracks by last-seen time and re-insert a returning track id"""
+    evicted_ids = []
+    store = TrackStateStore(ttl=2.0, on_evict=lambda record: evicted_ids.append(record.track_id))
+
+    print("Testing track state TTL eviction...")
+
+    # Test 1: Three tracks appear at t=0
+    print("\n--- Test 1: Tracks 1, 2 and 3 seen at t=0 ---")
+    for track_id in (1, 2, 3):
+        store.touch(track_id, now=0.0)
+    assert len(store) == 3
+
+    # Test 2: Track 2 is seen again; nothing is older than the TTL yet
+    print("--- Test 2: Track 2 seen again at t=1.5 ---")
+    store.touch(2, now=1.5)
+    assert store.evict_expired(now=2.0) == 0
+    assert len(store) == 3
+
+    # Test 3: Tracks 1 and 3 expire, track 2 was refreshed and stays
+    print("--- Test 3: Evict at t=2.5 ---")
+    assert store.evict_expired(now=2.5) == 2
+    assert sorted(evicted_ids) == [1, 3]
+    assert 1 not in store and 3 not in store
+    assert 2 in store
+    print(f"Evicted: {evicted_ids}, remaining: {[record.track_id for record in store.values()]}")
+
+    # Test 4: Track 1 returns after eviction and gets a fresh record
+    print("--- Test 4: Track 1 reappears at t=3.0 ---")
+    store.get(2).counted = True
+    record = store.touch(1, now=3.0)
+    assert record.track_id == 1
+    assert record.last_seen == 3.0
+    assert not record.counted and record.current_section is None
+    assert store.created == 4
+
+    # Test 5: Track 2 expires, the returning track 1 is kept until its own TTL
+    print("--- Test 5: Evict at t=4.0 and t=5.5 ---")
+    assert store.evict_expired(now=4.0) == 1
+    assert evicted_ids[-1] == 2
+    assert 1 in store
+    assert store.evict_expired(now=5.5) == 1
+    assert len(store) == 0
+
+    stats = store.stats()
+    print(f"Store stats: {stats}")
+    assert stats['created'] == 4 and stats['evicted'] == 4 and stats['peak_size'] == 3
+
+    print("Track state test completed!")
+
+
+if __name__ == "__main__":
+    test_track_state_store()
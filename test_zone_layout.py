@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the polygon zone layout
+Checks lane ids against the old frame_width // 3 split and lookups in a polygon zone
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from zone_module import ZoneLayout
+
+
+def old_vertical_section(x, frame_width):
+    """Section of a point as the session computed it before zone layouts"""
+    section_width = frame_width // 3
+    return min(int(x // section_width), 2)
+
+
+def test_lanes_match_old_split():
+    """Three lanes must give the same section as the old split for every pixel column"""
+    for frame_width, frame_height in ((640, 480), (1280, 720), (1000, 600)):
+        layout = ZoneLayout.lanes(3, frame_width, frame_height)
+        xs = np.arange(frame_width, dtype=np.float32)
+        # Fractional positions too, as box centres are
+        xs = np.concatenate([xs, xs + 0.5])
+        for y in (0, frame_height // 2, frame_height - 1):
+            points = np.stack([xs, np.full_like(xs, y)], axis=1)
+            expected = [old_vertical_section(x, frame_width) for x in xs.tolist()]
+            assert layout.zone_of(points).tolist() == expected, (frame_width, y)
+        print(f"{frame_width}x{frame_height}: lane ids match the old split")
+
+    layout = ZoneLayout.lanes(3, 640, 480)
+    # Outside the frame there is no section
+    assert layout.zone_of([(-1, 10), (640, 10), (10, 480)]).tolist() == [-1, -1, -1]
+    assert layout.zone_at(700, 10) is None
+    assert layout.counts([(10, 10), (300, 10), (310, 20), (600, 400), (900, 10)]).tolist() == [1, 2, 1]
+
+
+def test_polygon_zone():
+    """A slanted polygon zone over a lane; the lower id wins where they overlap"""
+    polygon = [(100, 50), (400, 80), (350, 300), (120, 260)]
+    lane = [(0, 0), (199, 0), (199, 479), (0, 479)]
+    layout = ZoneLayout([polygon, lane], 640, 480)
+
+    contour = np.array(polygon, dtype=np.int32)
+    rng = np.random.default_rng(0)
+    points = rng.uniform((0, 0), (640, 480), size=(2000, 2)).astype(np.float32)
+    zone_ids = layout.zone_of(points)
+    for (x, y), zone_id in zip(points.tolist(), zone_ids.tolist()):
+        px, py = int(np.floor(x)), int(np.floor(y))
+        # Skip the polygon's edge pixels, where rasterization and the exact test may disagree
+        distance = cv2.pointPolygonTest(contour, (px, py), True)
+        if abs(distance) <= 1:
+            continue
+        if distance > 0:
+            expected = 0
+        elif px <= 199:
+            expected = 1
+        else:
+            expected = -1
+        assert zone_id == expected, ((x, y), zone_id, expected)
+
+    assert layout.zone_at(250, 150) == 0  # Inside the polygon only
+    assert layout.zone_at(150, 150) == 0  # Polygon over the lane: lower id wins
+    assert layout.zone_at(50, 400) == 1  # Lane only
+    assert layout.zone_at(600, 400) is None
+    assert layout.bounds(0) == [(100, 50), (400, 300)]
+    print("Polygon zone lookups match the polygon")
+
+
+if __name__ == "__main__":
+    test_lanes_match_old_split()
+    test_polygon_zone()
+    print("Zone layout test completed!")